@@ -1,17 +1,12 @@
 """Entry point for Summarizely CLI."""
 
 import argparse
-import os
+import re
 import sys
-import warnings
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
 # Suppress runtime warnings before any imports
-os.environ["PYTHONWARNINGS"] = "ignore::RuntimeWarning"
-os.environ["DISABLE_AIOHTTP_TRANSPORT"] = "True"
-os.environ["LITELLM_LOG"] = "ERROR"
-warnings.filterwarnings("ignore", category=RuntimeWarning, module="litellm")
-warnings.filterwarnings("ignore", message="coroutine.*was never awaited")
+from . import _bootstrap  # noqa: F401
 
 
 class BlankLinesHelpFormatter(argparse.RawTextHelpFormatter):
@@ -60,10 +55,18 @@ class CompressionLevel:
     }
 
 
+# Module-level alias table so lookups skip the class attribute access
+_ALIASES: Dict[str, int] = CompressionLevel.ALIASES
+
+# Planner strategies: local knapsack solver for small plans, or always the LLM
+PLANNER_STRATEGIES: Tuple[str, ...] = ('dp', 'llm')
+
+
 def parse_compression_level(value: str) -> int:
-    """Parse compression level from string to internal value."""
-    if value in CompressionLevel.ALIASES:
-        return CompressionLevel.ALIASES[value]
+    """Parse compression level from string to internal value (case-insensitive)."""
+    level = _ALIASES.get(value.strip().lower())
+    if level is not None:
+        return level
 
     valid_options = ', '.join(sorted(CompressionLevel.ALIASES.keys()))
     raise argparse.ArgumentTypeError(
@@ -71,11 +74,24 @@ def parse_compression_level(value: str) -> int:
     )
 
 
+def parse_planner_strategy(value: str) -> str:
+    """Validate the planner strategy name."""
+    if value in PLANNER_STRATEGIES:
+        return value
+    raise argparse.ArgumentTypeError(
+        f"Invalid planner strategy: '{value}'. Valid options: {', '.join(PLANNER_STRATEGIES)}"
+    )
+
+
 def parse_patterns(pattern_string: str) -> List[str]:
     """Parse comma-separated patterns into a list."""
     if not pattern_string:
         return []
-    return [p.strip() for p in pattern_string.split(',') if p.strip()]
+    return list(filter(None, map(str.strip, pattern_string.split(','))))
+
+
+# Matches everything that is not an ASCII digit, e.g. "8,000" or "8k tokens"
+_NON_DIGITS = re.compile(r'[^0-9]+')
 
 
 def parse_budget(budget_string: Optional[str]) -> Optional[int]:
@@ -83,7 +99,7 @@ def parse_budget(budget_string: Optional[str]) -> Optional[int]:
     if not budget_string:
         return None
 
-    digits = ''.join(c for c in budget_string if c.isdigit())
+    digits = _NON_DIGITS.sub('', budget_string)
     if not digits:
         raise ValueError("Budget must contain at least one digit")
 
@@ -106,12 +122,160 @@ def build_compression_config(args: argparse.Namespace) -> Dict[str, int]:
     ]
 
     for arg_value, level in compression_args:
+        # Most levels are not given on a typical command line
+        if not arg_value:
+            continue
         for pattern in parse_patterns(arg_value):
             config[pattern] = level
 
     return config
 
 
+# Option table for the fast path in parse_args_fast(): flag -> (dest, takes_value).
+# Must stay in sync with create_parser(); anything not listed here falls back
+# to argparse, which owns help output and error reporting.
+_FAST_OPTIONS: Dict[str, Tuple[str, bool]] = {
+    '-o': ('output_dir', True), '--output-dir': ('output_dir', True),
+    '-i': ('include', True), '--include': ('include', True),
+    '-e': ('exclude', True), '--exclude': ('exclude', True),
+    '-b': ('budget', True), '--budget': ('budget', True),
+    '--buffer-percent': ('buffer_percent', True),
+    '--planner': ('planner', True),
+    '--planner-strategy': ('planner_strategy', True),
+    '--summarizer': ('summarizer', True),
+    '--tokens-per-minute': ('tokens_per_minute', True),
+    '-m': ('model', True), '--encoding-model': ('model', True),
+    '--default-compression': ('default_compression', True),
+    '--compression-0': ('no_compression', True), '--no-compression': ('no_compression', True),
+    '--compression-5': ('compression_5', True),
+    '--compression-15': ('compression_15', True),
+    '--compression-50': ('compression_50', True),
+    '--compression-90': ('compression_90', True),
+    '--compression-100': ('compression_100', True),
+    '--line-numbers': ('line_numbers', True),
+    '--strict-glob': ('strict_glob', False),
+    '--no-ignore': ('no_ignore', False),
+    '--no-clipboard': ('no_clipboard', False),
+    '--no-cache': ('no_cache', False),
+    '--count-only': ('count_only', False),
+}
+
+# Defaults applied by the fast path (mirrors the argparse defaults)
+_FAST_DEFAULTS: Dict[str, object] = {
+    'output_dir': './', 'include': '**/*', 'exclude': '', 'budget': None,
+    'buffer_percent': 10, 'planner': 'o3-mini', 'planner_strategy': 'dp',
+    'summarizer': 'gpt-4.1-nano',
+    'tokens_per_minute': None,
+    'model': 'cl100k_base', 'default_compression': CompressionLevel.TRIM,
+    'no_compression': '', 'compression_5': '', 'compression_15': '',
+    'compression_50': '', 'compression_90': '', 'compression_100': '',
+    'line_numbers': '', 'strict_glob': False, 'no_ignore': False,
+    'no_clipboard': False, 'no_cache': False, 'count_only': False,
+}
+
+# Value converters for options that are not plain strings
+_FAST_TYPES = {
+    'buffer_percent': int,
+    'planner_strategy': parse_planner_strategy,
+    'tokens_per_minute': int,
+    'default_compression': parse_compression_level,
+}
+
+
+def parse_args_fast(argv: Sequence[str]) -> Optional[argparse.Namespace]:
+    """Parse well-formed command lines without building the argparse parser.
+
+    Handles the common shapes (one positional path, known flags given as
+    "--flag value" or "--flag=value"). Returns None for anything else, such
+    as -h/--help, abbreviations, unknown flags or invalid values, so the
+    caller can fall back to argparse for help and error output.
+
+    Args:
+        argv: Command-line arguments without the program name
+
+    Returns:
+        Parsed namespace, or None if argparse should handle the arguments
+    """
+    values = dict(_FAST_DEFAULTS)
+    positionals = []
+    i = 0
+
+    while i < len(argv):
+        token = argv[i]
+        i += 1
+
+        if not token.startswith('-') or token == '-':
+            positionals.append(token)
+            continue
+
+        flag, has_inline, inline_value = token.partition('=')
+        option = _FAST_OPTIONS.get(flag)
+        if option is None or (has_inline and not flag.startswith('--')):
+            return None
+        dest, takes_value = option
+
+        if not takes_value:
+            if has_inline:
+                return None
+            values[dest] = True
+            continue
+
+        if has_inline:
+            value = inline_value
+        elif i < len(argv) and not argv[i].startswith('-'):
+            value = argv[i]
+            i += 1
+        else:
+            return None
+
+        converter = _FAST_TYPES.get(dest)
+        if converter is not None:
+            try:
+                value = converter(value)
+            except (ValueError, argparse.ArgumentTypeError):
+                return None
+        values[dest] = value
+
+    if len(positionals) != 1:
+        return None
+
+    return argparse.Namespace(path=positionals[0], **values)
+
+
+# Help text for --default-compression, built once at import. Literal '%' is
+# escaped because argparse %-formats help strings.
+_DEFAULT_COMPRESSION_HELP = 'Default compression level:\n' + '\n'.join(
+    f'"{alias}" - {CompressionLevel.DESCRIPTIONS[level]}'
+    for alias, level in (
+        ('0/none', CompressionLevel.NONE),
+        ('5/trim', CompressionLevel.TRIM),
+        ('15/light', CompressionLevel.LIGHT),
+        ('50/medium', CompressionLevel.MEDIUM),
+        ('90/heavy', CompressionLevel.HEAVY),
+        ('100/max', CompressionLevel.MAX)
+    )
+).replace('%', '%%')
+
+# Per-pattern compression options: (option strings, dest, help)
+_COMPRESSION_OPTIONS: Tuple[Tuple[Tuple[str, ...], str, str], ...] = tuple(
+    (options, dest, f'Comma-separated globs for files to {desc}'.replace('%', '%%'))
+    for options, dest, desc in (
+        (('--compression-0', '--no-compression'), 'no_compression',
+         'no compression (0%), preserve unchanged'),
+        (('--compression-5',), 'compression_5',
+         'trim compression (5%), remove imports/whitespace'),
+        (('--compression-15',), 'compression_15',
+         'light compression (15%), remove redundant comments'),
+        (('--compression-50',), 'compression_50',
+         'medium compression (50%), simplify functions'),
+        (('--compression-90',), 'compression_90',
+         'heavy compression (90%), skeleton only'),
+        (('--compression-100',), 'compression_100',
+         'maximum compression (100%), 1-3 sentences'),
+    )
+)
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure the argument parser."""
     parser = argparse.ArgumentParser(
@@ -165,12 +329,29 @@ def create_parser() -> argparse.ArgumentParser:
         help='LLM model for compression planning (default: o3-mini)'
     )
 
+    parser.add_argument(
+        '--planner-strategy',
+        type=parse_planner_strategy,
+        default='dp',
+        metavar='{dp,llm}',
+        help='Planning strategy: "dp" solves plans of up to a few hundred files\n'
+             'locally and uses the planner model only for larger ones;\n'
+             '"llm" always uses the planner model (default: dp)'
+    )
+
     parser.add_argument(
         '--summarizer',
         default='gpt-4.1-nano',
         help='LLM model for summarization (default: gpt-4.1-nano)'
     )
 
+    parser.add_argument(
+        '--tokens-per-minute',
+        type=int,
+        metavar='TPM',
+        help='Token rate limit for summarizer requests; paces calls by prompt size'
+    )
+
     parser.add_argument(
         '-m', '--encoding-model',
         default='cl100k_base',
@@ -179,54 +360,23 @@ def create_parser() -> argparse.ArgumentParser:
     )
 
     # Compression settings
-    compression_help = '\n'.join(
-        f'"{alias}" - {CompressionLevel.DESCRIPTIONS[level]}'
-        for alias, level in [
-            ('0/none', CompressionLevel.NONE),
-            ('5/trim', CompressionLevel.TRIM),
-            ('15/light', CompressionLevel.LIGHT),
-            ('50/medium', CompressionLevel.MEDIUM),
-            ('90/heavy', CompressionLevel.HEAVY),
-            ('100/max', CompressionLevel.MAX)
-        ]
-    )
-
     parser.add_argument(
         '--default-compression',
         type=parse_compression_level,
         default=CompressionLevel.TRIM,
         metavar='LEVEL',
-        help=f'Default compression level:\n{compression_help}'
+        help=_DEFAULT_COMPRESSION_HELP
     )
 
     # Per-pattern compression levels
-    compression_levels = [
-        (0, 'no-compression', 'no compression (0%), preserve unchanged'),
-        (5, 'compression-trim', 'trim compression (5%), remove imports/whitespace'),
-        (15, 'compression-light', 'light compression (15%), remove redundant comments'),
-        (50, 'compression-medium', 'medium compression (50%), simplify functions'),
-        (90, 'compression-heavy', 'heavy compression (90%), skeleton only'),
-        (100, 'compression-max', 'maximum compression (100%), 1-3 sentences'),
-    ]
-
-    for level, name, desc in compression_levels:
-        dest = name.replace('-', '_')
-        if level == 0:
-            parser.add_argument(
-                f'--compression-{level}', f'--{name}',
-                default='',
-                metavar='GLOBS',
-                dest=dest,
-                help=f'Comma-separated globs for files to {desc}'
-            )
-        else:
-            parser.add_argument(
-                f'--compression-{level}',
-                default='',
-                metavar='GLOBS',
-                dest=f'compression_{level}',
-                help=f'Comma-separated globs for files to {desc}'
-            )
+    for option_strings, dest, help_text in _COMPRESSION_OPTIONS:
+        parser.add_argument(
+            *option_strings,
+            default='',
+            metavar='GLOBS',
+            dest=dest,
+            help=help_text
+        )
 
     # Additional options
     parser.add_argument(
@@ -255,6 +405,12 @@ def create_parser() -> argparse.ArgumentParser:
         help='Do not copy output to clipboard'
     )
 
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Do not reuse or store cached planner results'
+    )
+
     parser.add_argument(
         '--count-only',
         action='store_true',
@@ -266,8 +422,9 @@ def create_parser() -> argparse.ArgumentParser:
 
 def main() -> int:
     """Main entry point for the CLI."""
-    parser = create_parser()
-    args = parser.parse_args()
+    args = parse_args_fast(sys.argv[1:])
+    if args is None:
+        args = create_parser().parse_args()
 
     # Parse patterns
     include_patterns = parse_patterns(args.include)
@@ -278,7 +435,7 @@ def main() -> int:
     try:
         budget = parse_budget(args.budget)
     except ValueError as e:
-        parser.error(str(e))
+        create_parser().error(str(e))
         return 1
 
     # Build compression configuration
@@ -305,7 +462,10 @@ def main() -> int:
         respect_gitignore=(not args.no_ignore),
         compression_config=compression_config,
         line_number_patterns=line_number_patterns,
-        no_clipboard=args.no_clipboard
+        no_clipboard=args.no_clipboard,
+        tokens_per_minute=args.tokens_per_minute,
+        use_plan_cache=(not args.no_cache),
+        planner_strategy=args.planner_strategy
     )
 
     # Execute the appropriate action
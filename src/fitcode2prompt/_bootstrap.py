@@ -0,0 +1,39 @@
+"""Process-wide setup that quiets litellm before it is imported.
+
+Importing this module applies the environment variables and warning filters
+once; Python's module cache makes later imports no-ops, so the filters are
+not appended to ``warnings.filters`` again by each module that needs them.
+"""
+
+import logging
+import os
+import warnings
+
+os.environ.setdefault("PYTHONWARNINGS", "ignore::RuntimeWarning")
+os.environ.setdefault("DISABLE_AIOHTTP_TRANSPORT", "True")
+os.environ.setdefault("LITELLM_LOG", "ERROR")
+warnings.filterwarnings("ignore", category=RuntimeWarning, module="litellm")
+warnings.filterwarnings("ignore", message="coroutine.*was never awaited")
+
+# Whether bootstrap_once() has already run in this process
+_BOOTSTRAPPED = False
+
+
+def bootstrap_once() -> None:
+    """Load .env and quiet the HTTP loggers, once per process.
+    
+    Called by the components that talk to LLMs rather than at import, so
+    importing the package (or --help and --count-only runs) never reads
+    .env from disk.
+    """
+    global _BOOTSTRAPPED
+    if _BOOTSTRAPPED:
+        return
+    _BOOTSTRAPPED = True
+    
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Suppress litellm's verbose logging
+    for name in ("LiteLLM", "httpx", "httpcore"):
+        logging.getLogger(name).setLevel(logging.WARNING)
@@ -1,29 +1,16 @@
 """Async processor for parallel summarization with litellm."""
 
-import os
-import warnings
-
-# Suppress litellm warnings  
-os.environ["LITELLM_LOG"] = "ERROR"
-os.environ["DISABLE_AIOHTTP_TRANSPORT"] = "True"
-warnings.filterwarnings("ignore", category=RuntimeWarning, module="litellm")
-warnings.filterwarnings("ignore", message="coroutine.*was never awaited")
+# Suppress litellm warnings before it is imported
+from ._bootstrap import bootstrap_once
 
 import asyncio
 import logging
+import os
+import re
+import sys
 import time
-from fnmatch import fnmatch
-from pathlib import Path
-from typing import Dict, List, Set
-
-from litellm import acompletion
-
-from .shrink_prompts import CODE_PROMPTS, DOC_PROMPTS
-from .tokenizer import Tokenizer
-
-# Suppress HTTP request logging
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
+from fnmatch import translate
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +26,110 @@ TIER_NAMES: Dict[int, str] = {
     50: "medium", 10: "heavy", 0: "max"
 }
 
+# Characters that give a glob pattern special meaning
+GLOB_MAGIC_CHARS = frozenset('*?[')
+
+# fnmatch normcases both sides on Windows (case-insensitive, '/' read as
+# '\\'); compiled matchers mirror that
+NORMCASE_PATHS = os.name == 'nt'
+
+
+def _compile_glob_matcher(pattern: str) -> Callable[[str], bool]:
+    """Build a matcher with fnmatch semantics, using string ops where possible.
+    
+    Literal patterns compare with ==, "*suffix" patterns use str.endswith,
+    and everything else falls back to a compiled fnmatch regex. Like
+    fnmatch, the pattern and value are normcased first, which only changes
+    them on Windows.
+    
+    Args:
+        pattern: Glob pattern
+        
+    Returns:
+        Callable that returns True when a string matches the pattern
+    """
+    pattern = os.path.normcase(pattern)
+    suffix = pattern[1:]
+    
+    if not GLOB_MAGIC_CHARS.intersection(pattern):
+        matches = pattern.__eq__
+    elif pattern.startswith('*') and not GLOB_MAGIC_CHARS.intersection(suffix):
+        matches = lambda value: value.endswith(suffix)
+    else:
+        regex = re.compile(translate(pattern))
+        matches = lambda value: regex.match(value) is not None
+    
+    if NORMCASE_PATHS:
+        return lambda value: matches(os.path.normcase(value))
+    return matches
+
+
+class FileResult(NamedTuple):
+    """Outcome of processing a single file."""
+    path: str
+    tier: int
+    success: bool
+    original_tokens: int
+    compressed_tokens: int
+    summary: str = ''
+    error: str = ''
+
+
+# Maximum number of cached line number match results
+LINE_NUMBER_CACHE_SIZE = 10000
+
+# Maximum number of cached (relative path, basename) lookups
+RELATIVE_PATH_CACHE_SIZE = 4096
+
+# Number of progress lines buffered between stdout writes
+PROGRESS_FLUSH_INTERVAL = 16
+
+
+class TokenRateLimiter:
+    """Token bucket that paces requests by their token cost.
+    
+    The bucket holds up to one minute of tokens and refills continuously,
+    so large prompts consume proportionally more of the rate limit than
+    small ones instead of every request counting the same.
+    """
+    
+    def __init__(self, tokens_per_minute: int) -> None:
+        """
+        Initialize the limiter with a full bucket.
+        
+        Args:
+            tokens_per_minute: Token budget per minute for the model
+        """
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60
+        self.tokens = float(tokens_per_minute)
+        self.updated = time.monotonic()
+        # Created lazily so it binds to the loop that runs the requests
+        self._lock: Optional[asyncio.Lock] = None
+    
+    async def acquire(self, cost: int) -> None:
+        """Wait until `cost` tokens are available and consume them.
+        
+        Args:
+            cost: Estimated tokens for the request (capped at the bucket size)
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        
+        cost = min(cost, self.capacity)
+        
+        # Waiters are served one at a time, in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= cost:
+                    self.tokens -= cost
+                    return
+                
+                await asyncio.sleep((cost - self.tokens) / self.rate)
 
 
 class AsyncProcessor:
@@ -48,7 +139,9 @@ class AsyncProcessor:
         self, 
         model: str, 
         max_concurrent: int = 50, 
-        line_number_patterns: List[str] = None
+        line_number_patterns: List[str] = None,
+        tokens_per_minute: Optional[int] = None,
+        tokenizer=None
     ) -> None:
         """
         Initialize async processor.
@@ -57,11 +150,49 @@ class AsyncProcessor:
             model: LLM model to use (required)
             max_concurrent: Maximum concurrent requests (default 50)
             line_number_patterns: Patterns for files to add line numbers (only for uncompressed files)
+            tokens_per_minute: Token rate limit for the model; requests are paced by
+                their input size (default: None, no token pacing)
+            tokenizer: Tokenizer for counting compressed output; share the caller's
+                so counts it caches are reused (default: None, one for `model`)
         """
+        # API keys from .env and quiet HTTP logging
+        bootstrap_once()
         self.model = model
-        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.max_concurrent = max_concurrent
+        # Created per batch so it binds to the loop that runs the requests;
+        # on Python 3.9 a semaphore built here would be tied to whatever
+        # loop get_event_loop() returned at construction
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.rate_limiter = TokenRateLimiter(tokens_per_minute) if tokens_per_minute else None
         self.line_number_patterns = line_number_patterns or []
-        self.tokenizer = Tokenizer(model)
+        # Compile line number globs once instead of on every fnmatch() call
+        self._ln_matchers = [_compile_glob_matcher(p) for p in self.line_number_patterns]
+        # Match results keyed by the (rel_path, basename) tuple both matchers see;
+        # plain tuples hash natively, no serialization. Evicted oldest-first.
+        self._ln_cache: Dict[Tuple[str, str], bool] = {}
+        # (rel_path, basename) per (filepath, base_path); per instance so the
+        # cache does not outlive the processor. Evicted oldest-first.
+        self._rel_path_cache: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        # Resolved base directory per base path given by the caller
+        self._base_dirs: Dict[str, str] = {}
+        # Prompt templates split around the {code} placeholder, indexed by
+        # is_doc and then by tier_index(tier)
+        from .shrink_prompts import CODE_PROMPT_TUPLE, DOC_PROMPT_TUPLE, tier_index
+        self._prompts = (CODE_PROMPT_TUPLE, DOC_PROMPT_TUPLE)
+        self._tier_index = tier_index
+        # Progress lines waiting to be written to stdout
+        self._progress_buf: List[str] = []
+        # Created on first compression unless the caller shares one;
+        # --help and --count-only never need it
+        self._tokenizer = tokenizer
+    
+    @property
+    def tokenizer(self):
+        """Tokenizer for counting compressed output, created on first use."""
+        if self._tokenizer is None:
+            from .tokenizer import CachedTokenizer
+            self._tokenizer = CachedTokenizer(self.model)
+        return self._tokenizer
     
     def _should_add_line_numbers(self, filepath: str, base_path: str) -> bool:
         """Check if a file should have line numbers added (only for uncompressed files).
@@ -76,14 +207,42 @@ class AsyncProcessor:
         if not self.line_number_patterns:
             return False
         
-        rel_path, basename = self._get_relative_path_parts(filepath, base_path)
+        key = self._get_relative_path_parts(filepath, base_path)
+        rel_path, basename = key
         
-        return any(
-            fnmatch(rel_path, pattern) or fnmatch(basename, pattern)
-            for pattern in self.line_number_patterns
+        cached = self._ln_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        result = any(
+            matches(rel_path) or matches(basename)
+            for matches in self._ln_matchers
         )
+        
+        if len(self._ln_cache) >= LINE_NUMBER_CACHE_SIZE:
+            self._ln_cache.pop(next(iter(self._ln_cache)))
+        self._ln_cache[key] = result
+        
+        return result
     
-    def _get_relative_path_parts(self, filepath: str, base_path: str) -> tuple[str, str]:
+    def _resolve_base(self, base_path: str) -> str:
+        """Resolve the base directory once per base path.
+        
+        Args:
+            base_path: Base path (directory or file) given by the caller
+            
+        Returns:
+            Real path of the base directory
+        """
+        base = self._base_dirs.get(base_path)
+        if base is None:
+            base = os.path.realpath(base_path)
+            if os.path.isfile(base):
+                base = os.path.dirname(base)
+            self._base_dirs[base_path] = base
+        return base
+    
+    def _get_relative_path_parts(self, filepath: str, base_path: str) -> Tuple[str, str]:
         """Get relative path and basename for a file.
         
         Args:
@@ -93,16 +252,26 @@ class AsyncProcessor:
         Returns:
             Tuple of (relative_path, basename)
         """
+        cached = self._rel_path_cache.get((filepath, base_path))
+        if cached is not None:
+            return cached
+        
+        base = self._resolve_base(base_path)
         try:
-            base = Path(base_path).resolve()
-            if base.is_file():
-                base = base.parent
-            file_path = Path(filepath).resolve()
-            rel_path = str(file_path.relative_to(base))
+            rel_path = os.path.relpath(os.path.realpath(filepath), base)
         except ValueError:
+            # Different drive on Windows
             rel_path = filepath
-        
-        return rel_path, Path(filepath).name
+        else:
+            # Keep the original path for files outside the base directory
+            if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+                rel_path = filepath
+        
+        parts = (rel_path, os.path.basename(filepath))
+        if len(self._rel_path_cache) >= RELATIVE_PATH_CACHE_SIZE:
+            self._rel_path_cache.pop(next(iter(self._rel_path_cache)))
+        self._rel_path_cache[(filepath, base_path)] = parts
+        return parts
     
     def _add_line_numbers(self, content: str) -> str:
         """Add line numbers to content.
@@ -117,27 +286,30 @@ class AsyncProcessor:
         max_line_num = len(lines)
         line_num_width = len(str(max_line_num))
         
-        return '\n'.join(
-            f"{i:>{line_num_width}}│ {line}"
-            for i, line in enumerate(lines, 1)
-        )
+        # Resolve the width once and give join() a list so it can size
+        # the result in a single pass
+        fmt = f"{{:>{line_num_width}}}│ {{}}".format
+        return '\n'.join([fmt(i, line) for i, line in enumerate(lines, 1)])
         
     async def process_files_with_plan(
         self, 
         files_plan: List[Dict[str, any]],
         base_path: str
-    ) -> List[Dict[str, any]]:
+    ) -> List[FileResult]:
         """
         Process files according to the compression plan.
         
         Args:
-            files_plan: List of file plans from planner
+            files_plan: List of file plans from planner. Each entry has 'path',
+                'tier' and 'original_tokens', plus an optional 'content' with
+                the already-read file text to skip reading it again
             base_path: Base path for reading files
             
         Returns:
             List of results with summaries
         """
         start_time = time.time()
+        self.semaphore = asyncio.Semaphore(self.max_concurrent)
         
         # Create all tasks at once
         tasks = [
@@ -147,83 +319,101 @@ class AsyncProcessor:
         
         print(f"\n🚀 Started {len(tasks)} async compression tasks (model: {self.model})...")
         
+        # Without a terminal nobody watches live progress, so skip the
+        # per-task as_completed() scheduling and report once at the end
+        if not sys.stdout.isatty():
+            results = await asyncio.gather(*tasks)
+            self._print_batch_summary(results, time.time() - start_time)
+            return list(results)
+        
         # Process results as they complete
         results = []
         completed = 0
         
-        async for task in self._process_tasks_with_progress(tasks, start_time):
-            result = await task
+        for next_done in asyncio.as_completed(tasks):
+            result = await next_done
             completed += 1
             self._print_progress(result, completed, len(tasks), time.time() - start_time)
             results.append(result)
         
         return results
     
-    async def _process_tasks_with_progress(
-        self, 
-        tasks: List[asyncio.Task], 
-        start_time: float
-    ):
-        """Yield tasks as they complete.
+    def _print_batch_summary(self, results: List[FileResult], elapsed: float) -> None:
+        """Print a one-line summary for a batch processed without live progress.
         
         Args:
-            tasks: List of tasks to process
-            start_time: Start time for elapsed calculation
-            
-        Yields:
-            Completed tasks
+            results: All task results
+            elapsed: Elapsed time in seconds
         """
-        for task in asyncio.as_completed(tasks):
-            yield task
+        failed = [r for r in results if not r.success]
+        lines = [f"✓ Completed {len(results) - len(failed)}/{len(results)} tasks ({elapsed:.1f}s)"]
+        lines.extend(
+            f"✗ {os.path.basename(r.path)} [{TIER_NAMES.get(r.tier, r.tier)}] - FAILED"
+            for r in failed
+        )
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
     
     def _print_progress(
         self, 
-        result: Dict[str, any], 
+        result: FileResult, 
         completed: int, 
         total: int, 
         elapsed: float
     ) -> None:
         """Print progress for a completed task.
         
+        Lines are buffered and written every PROGRESS_FLUSH_INTERVAL
+        completions, and once more when the last task finishes.
+        
         Args:
             result: Task result
             completed: Number of completed tasks
             total: Total number of tasks
             elapsed: Elapsed time in seconds
         """
-        rel_path = Path(result['path']).name
-        tier = result.get('tier', 100)
+        rel_path = os.path.basename(result.path)
+        tier = result.tier
         tier_name = TIER_NAMES.get(tier, f"{tier}%")
         
-        if result['success']:
+        if result.success:
             # Success - show in green
             status = f"\033[92m✓ [{completed}/{total}] {rel_path} [{tier_name}] ({elapsed:.1f}s)\033[0m"
         else:
             # Failure - show in red
             status = f"\033[91m✗ [{completed}/{total}] {rel_path} [{tier_name}] ({elapsed:.1f}s) - FAILED\033[0m"
         
-        print(status)
+        self._progress_buf.append(status)
+        if completed % PROGRESS_FLUSH_INTERVAL == 0 or completed == total:
+            sys.stdout.write('\n'.join(self._progress_buf) + '\n')
+            sys.stdout.flush()
+            self._progress_buf.clear()
     
     async def _process_single_file(
         self, 
         file_info: Dict[str, any],
         base_path: str
-    ) -> Dict[str, any]:
+    ) -> FileResult:
         """Process a single file according to its compression tier.
         
         Args:
-            file_info: File information including path, tier, and tokens
+            file_info: File information including path, tier, tokens and
+                optionally the file content
             base_path: Base path for relative path calculation
             
         Returns:
-            Processing result dictionary
+            Processing result
         """
         filepath = file_info['path']
         tier = file_info['tier']
         original_tokens = file_info['original_tokens']
         
         try:
-            content = self._read_file_content(filepath)
+            # Reuse content read upstream; otherwise read in a worker thread
+            # so slow disks don't stall the event loop
+            content = file_info.get('content')
+            if content is None:
+                content = await asyncio.to_thread(self._read_file_content, filepath)
             
             # Handle uncompressed files (tier 100)
             if tier == 100:
@@ -267,7 +457,7 @@ class AsyncProcessor:
         tier: int, 
         original_tokens: int,
         base_path: str
-    ) -> Dict[str, any]:
+    ) -> FileResult:
         """Handle files that don't need compression.
         
         Args:
@@ -278,16 +468,20 @@ class AsyncProcessor:
             base_path: Base path for relative path calculation
             
         Returns:
-            Result dictionary
+            File result
         """
-        file_ext = Path(filepath).suffix.lower()
+        file_ext = os.path.splitext(filepath)[1].lower()
+        
+        compressed_tokens = original_tokens
         
         # Add line numbers for uncompressed code files if requested
         if file_ext not in DOC_EXTENSIONS and self._should_add_line_numbers(filepath, base_path):
             content = self._add_line_numbers(content)
+            # Count the numbered text so the result's token count matches its summary
+            compressed_tokens = self.tokenizer.count_tokens(content)
         
         return self._create_success_result(
-            filepath, tier, content, original_tokens, original_tokens
+            filepath, tier, content, original_tokens, compressed_tokens
         )
     
     def _handle_minimal_file(
@@ -296,7 +490,7 @@ class AsyncProcessor:
         content: str, 
         tier: int, 
         original_tokens: int
-    ) -> Dict[str, any]:
+    ) -> FileResult:
         """Handle files already at minimum size.
         
         Args:
@@ -306,7 +500,7 @@ class AsyncProcessor:
             original_tokens: Original token count
             
         Returns:
-            Result dictionary
+            File result
         """
         logger.info(
             f"{filepath}: Skipping compression - already at minimum size "
@@ -322,7 +516,7 @@ class AsyncProcessor:
         content: str, 
         tier: int, 
         original_tokens: int
-    ) -> Dict[str, any]:
+    ) -> FileResult:
         """Compress file content using LLM.
         
         Args:
@@ -332,11 +526,18 @@ class AsyncProcessor:
             original_tokens: Original token count
             
         Returns:
-            Result dictionary
+            File result
         """
         prompt = self._get_compression_prompt(filepath, content, tier)
         
         async with self.semaphore:
+            # Deferred so importing this module does not pull in litellm
+            from litellm import acompletion
+            
+            # Pace by prompt size so large files don't trigger 429 retries
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(original_tokens)
+            
             response = await acompletion(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
@@ -362,14 +563,12 @@ class AsyncProcessor:
         Returns:
             Formatted prompt string
         """
-        file_ext = Path(filepath).suffix.lower()
+        is_doc = os.path.splitext(filepath)[1].lower() in DOC_EXTENSIONS
+        prefix, suffix = self._prompts[is_doc][self._tier_index(tier)]
         
-        if file_ext in DOC_EXTENSIONS:
-            prompt_template = DOC_PROMPTS[tier]
-        else:
-            prompt_template = CODE_PROMPTS[tier]
-        
-        return prompt_template.replace("{code}", content)
+        # join() sizes the result once, so large files are copied exactly once
+        # (chained + would build an intermediate prefix+content string first)
+        return ''.join((prefix, content, suffix))
     
     def _create_success_result(
         self, 
@@ -378,8 +577,8 @@ class AsyncProcessor:
         content: str, 
         original_tokens: int, 
         compressed_tokens: int
-    ) -> Dict[str, any]:
-        """Create success result dictionary.
+    ) -> FileResult:
+        """Create a successful FileResult.
         
         Args:
             filepath: Path to the file
@@ -389,16 +588,16 @@ class AsyncProcessor:
             compressed_tokens: Compressed token count
             
         Returns:
-            Result dictionary
+            FileResult with success=True and the processed content as summary
         """
-        return {
-            'path': filepath,
-            'tier': tier,
-            'summary': content,
-            'success': True,
-            'original_tokens': original_tokens,
-            'compressed_tokens': compressed_tokens
-        }
+        return FileResult(
+            path=filepath,
+            tier=tier,
+            success=True,
+            original_tokens=original_tokens,
+            compressed_tokens=compressed_tokens,
+            summary=content
+        )
     
     def _create_error_result(
         self, 
@@ -406,8 +605,8 @@ class AsyncProcessor:
         tier: int, 
         original_tokens: int, 
         error: str
-    ) -> Dict[str, any]:
-        """Create error result dictionary.
+    ) -> FileResult:
+        """Create a failed FileResult.
         
         Args:
             filepath: Path to the file
@@ -416,15 +615,15 @@ class AsyncProcessor:
             error: Error message
             
         Returns:
-            Result dictionary
+            FileResult with success=False, no compressed tokens and the error
         """
-        return {
-            'path': filepath,
-            'tier': tier,
-            'error': error,
-            'success': False,
-            'original_tokens': original_tokens,
-            'compressed_tokens': 0
-        }
+        return FileResult(
+            path=filepath,
+            tier=tier,
+            success=False,
+            original_tokens=original_tokens,
+            compressed_tokens=0,
+            error=error
+        )
     
     
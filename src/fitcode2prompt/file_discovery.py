@@ -1,11 +1,51 @@
 """File discovery module for finding files matching glob patterns."""
 
+import codecs
+import functools
 import logging
 import mimetypes
+import os
 import re
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Tuple, Set, Optional, NamedTuple
-from fnmatch import fnmatch
+from typing import Callable, Dict, Iterable, Iterator, List, Match, Tuple, Set, Optional, NamedTuple, Pattern
+from fnmatch import translate
+
+try:
+    import hyperscan
+except ImportError:  # optional: large gitignore files fall back to re
+    hyperscan = None
+
+
+# fnmatch normalizes case on case-insensitive platforms; mirror that
+GITIGNORE_FLAGS = re.IGNORECASE if os.name == 'nt' else 0
+
+# Worker threads for per-file I/O; stat/open/read release the GIL
+IO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Validations in flight at once; the file stream is only read this far ahead
+# of the results, so it is never held as one future per file
+VALIDATE_WINDOW = IO_WORKERS * 4
+
+# Characters that make a path segment a wildcard for Path.glob
+GLOB_MAGIC_CHARS = frozenset('*?[')
+
+# Wildcard gitignore patterns needed before a Hyperscan database pays off
+# over a single Python alternation
+HYPERSCAN_MIN_PATTERNS = 32
+
+# Below this many candidates, a glob is matched against the files in memory
+# instead of walking the tree again
+GLOB_SUBSET_THRESHOLD = 256
+
+# Files larger than this are searched as raw bytes instead of being decoded
+# first, when the bytes give the same answer (see _search_content)
+BYTES_SEARCH_THRESHOLD = 64 * 1024
+
+# Bytes sniffed per file during validation; matches the text-mode read buffer
+# the readability check used to fill
+SNIFF_SIZE = 8192
 
 
 class PatternParts(NamedTuple):
@@ -14,6 +54,393 @@ class PatternParts(NamedTuple):
     content: Optional[str] = None
 
 
+class PatternGroup(NamedTuple):
+    """fnmatch patterns split into set lookups and a regex fallback."""
+    literals: frozenset            # patterns without wildcards, matched by equality
+    suffixes: Tuple[str, ...]      # '*<literal>' patterns, matched with endswith
+    regex: Optional[Pattern]       # everything else, as one alternation (or HyperscanMatcher)
+    
+    def matches(self, value: str) -> bool:
+        """Whether `value` matches any pattern in the group.
+        
+        Args:
+            value: Path string or path part
+            
+        Returns:
+            True if any pattern matches, as fnmatch would decide
+        """
+        return (
+            value in self.literals
+            or value.endswith(self.suffixes)
+            or (self.regex is not None and self.regex.match(value) is not None)
+        )
+
+
+class GitignoreMatcher(NamedTuple):
+    """Gitignore patterns compiled into one PatternGroup per matching rule."""
+    dirs: PatternGroup    # 'name/' patterns, matched against every path part
+    root: PatternGroup    # '/path' patterns, matched against the relative path
+    floats: PatternGroup  # other patterns, matched against the path and parent parts
+    
+    def prunes(self, name: str) -> bool:
+        """Whether every file below a directory with this name is ignored.
+        
+        Dir and floating patterns ignore a file when any parent part matches,
+        so a matching directory can be skipped without being walked.
+        
+        Args:
+            name: Directory name (a single path part)
+            
+        Returns:
+            True if the directory's whole subtree is ignored
+        """
+        return self.dirs.matches(name) or self.floats.matches(name)
+
+
+class GlobPlan(NamedTuple):
+    """Include glob reduced to a directory walk plus a file name match."""
+    start: Tuple[str, ...]  # literal leading segments, walked into directly
+    recursive: bool         # a '**' follows the literal segments
+    name_regex: Pattern     # final segment, matched against entry names
+
+
+class HyperscanMatcher:
+    """Many fnmatch patterns in one Hyperscan database, used like `Pattern.match`."""
+    
+    def __init__(self, patterns: List[str], fallback: Pattern) -> None:
+        """
+        Compile the patterns into a block-mode database.
+        
+        Args:
+            patterns: fnmatch-style patterns
+            fallback: Equivalent Python regex for values Hyperscan cannot take
+            
+        Raises:
+            hyperscan.error: If a translated pattern uses syntax Hyperscan lacks
+        """
+        flags = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_DOTALL | hyperscan.HS_FLAG_UTF8
+        if GITIGNORE_FLAGS:
+            flags |= hyperscan.HS_FLAG_CASELESS
+        
+        expressions = []
+        for pattern in patterns:
+            expression = translate(pattern)
+            # Hyperscan's \Z also matches before a final newline, like PCRE
+            if expression.endswith('\\Z'):
+                expression = expression[:-2] + '\\z'
+            expressions.append(('^' + expression).encode('utf-8'))
+        
+        self.fallback = fallback
+        self.database = hyperscan.Database()
+        self.database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[flags] * len(expressions),
+        )
+    
+    def match(self, value: str) -> Optional[bool]:
+        """Return True if any pattern matches the whole value, else None."""
+        try:
+            data = value.encode('utf-8')
+        except UnicodeEncodeError:
+            # Undecodable file names are not valid UTF-8 input for Hyperscan
+            return self.fallback.match(value)
+        
+        hits = []
+        self.database.scan(data, match_event_handler=lambda *match: hits.append(match))
+        return True if hits else None
+
+
+def _compile_pattern_group(patterns: List[str]) -> PatternGroup:
+    """Split fnmatch patterns into set lookups and one compiled alternation.
+    
+    Most gitignore lines are plain names ('node_modules') or '*.ext'
+    suffixes. Those are answered with a set lookup or str.endswith, which is
+    exactly what fnmatch decides for them since '*' matches any characters.
+    Only the remaining patterns go into the regex. Each translated pattern is
+    already anchored at its end, so the union is used with `match()`.
+    
+    Args:
+        patterns: fnmatch-style patterns
+        
+    Returns:
+        PatternGroup for the patterns
+    """
+    literals = set()
+    suffixes = []
+    wildcards = []
+    
+    for pattern in patterns:
+        pattern = os.path.normcase(pattern)
+        # Case-insensitive platforms need the regex's IGNORECASE
+        if GITIGNORE_FLAGS:
+            wildcards.append(pattern)
+        elif GLOB_MAGIC_CHARS.isdisjoint(pattern):
+            literals.add(pattern)
+        elif pattern.startswith('*') and GLOB_MAGIC_CHARS.isdisjoint(pattern[1:]):
+            suffixes.append(pattern[1:])
+        else:
+            wildcards.append(pattern)
+    
+    regex = None
+    if wildcards:
+        regex = re.compile('|'.join(translate(p) for p in wildcards), GITIGNORE_FLAGS)
+        
+        # Hundreds of wildcard lines are matched faster in one SIMD pass
+        if hyperscan is not None and len(wildcards) >= HYPERSCAN_MIN_PATTERNS:
+            try:
+                regex = HyperscanMatcher(wildcards, regex)
+            except hyperscan.error as e:
+                logging.debug(f"Hyperscan could not compile gitignore patterns: {e}")
+    
+    return PatternGroup(literals=frozenset(literals), suffixes=tuple(suffixes), regex=regex)
+
+
+@functools.lru_cache(maxsize=4096)
+def _mime_is_binary(suffixes: str) -> bool:
+    """Classify a file by the mimetype of its suffix chain.
+    
+    mimetypes only looks at the suffixes (including compression suffixes
+    like '.txt.xz'), so the result is cached per chain rather than per file.
+    
+    Args:
+        suffixes: All suffixes of the file name, e.g. '.tar.xz'
+        
+    Returns:
+        True if the mimetype is known and not text
+    """
+    mime_type, _ = mimetypes.guess_type('file' + suffixes)
+    if mime_type:
+        # Text files typically start with 'text/'
+        return not mime_type.startswith('text/')
+    
+    # Default to treating as text if unsure
+    return False
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_content(pattern: str) -> Pattern:
+    """Compile a content-search pattern once for all files it is tested on.
+    
+    Args:
+        pattern: Regular expression (or literal text) to search for
+        
+    Returns:
+        Compiled case-insensitive, multiline pattern
+    """
+    try:
+        return re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+    except re.error as e:
+        # If pattern is invalid regex, try literal search
+        logging.debug(f"Invalid regex pattern '{pattern}': {e}. Using literal search.")
+        return re.compile(re.escape(pattern), re.MULTILINE | re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_content_bytes(pattern: str) -> Optional[Pattern]:
+    """Compile the bytes form of a content-search pattern for raw-byte scans.
+    
+    Only ASCII patterns have a bytes form: their case folding is the same
+    in bytes mode, while non-ASCII patterns need the decoded text.
+    
+    Args:
+        pattern: Regular expression (or literal text) to search for
+        
+    Returns:
+        Compiled bytes pattern, or None if the pattern has no bytes form
+    """
+    if not pattern.isascii():
+        return None
+    
+    try:
+        return re.compile(_compile_content(pattern).pattern.encode('ascii'), re.MULTILINE | re.IGNORECASE)
+    except re.error:
+        # Escapes such as \u are only valid in str patterns
+        return None
+
+
+def _search_content(data: bytes, regex: Pattern, bytes_regex: Optional[Pattern]) -> bool:
+    """Search file content for a pattern the way its decoded text is searched.
+    
+    Large files are searched as raw bytes, skipping the decode, only when
+    that gives the same answer: the content is pure ASCII (so it is valid
+    UTF-8 and case folding, '\\w' or '.' behave alike in both modes) and has
+    no carriage returns (so no newline translation is needed). Anything else
+    is decoded as UTF-8 with the newline translation text mode would apply.
+    
+    Args:
+        data: Raw file content
+        regex: Compiled str pattern
+        bytes_regex: Bytes form of the same pattern, or None if it has none
+        
+    Returns:
+        True if the pattern is found in the content
+        
+    Raises:
+        UnicodeDecodeError: If the content is not valid UTF-8
+    """
+    if (
+        bytes_regex is not None
+        and len(data) > BYTES_SEARCH_THRESHOLD
+        and b'\r' not in data
+        and data.isascii()
+    ):
+        return bytes_regex.search(data) is not None
+    
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return regex.search(text) is not None
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_glob(pattern: str) -> Optional[GlobPlan]:
+    """Reduce a Path.glob pattern to a walk plan when the shape allows it.
+    
+    Supported shapes are literal directories, optionally followed by '**',
+    followed by a wildcard file name ('**/*.py', 'src/**/*', '*.md'). These
+    behave exactly like Path.glob: '**' does not descend into symlinked
+    directories and names are matched with fnmatch.translate. Anything else
+    (absolute or '..' patterns, wildcard directories, literal file names that
+    depend on filesystem case rules, trailing '**') is left to Path.glob.
+    
+    Args:
+        pattern: Glob pattern relative to the base directory
+        
+    Returns:
+        GlobPlan, or None if the pattern should go through Path.glob
+    """
+    if not pattern or '\\' in pattern or os.path.isabs(pattern) or os.path.splitdrive(pattern)[0]:
+        return None
+    
+    *directories, name = pattern.split('/')
+    if '**' in name or GLOB_MAGIC_CHARS.isdisjoint(name):
+        return None
+    
+    start = []
+    for index, segment in enumerate(directories):
+        if segment in ('', '.', '..') or ('**' in segment and segment != '**'):
+            return None
+        if segment == '**':
+            # Only '**' may follow once the literal prefix ends
+            if any(rest != '**' for rest in directories[index:]):
+                return None
+            break
+        if not GLOB_MAGIC_CHARS.isdisjoint(segment):
+            return None
+        start.append(segment)
+    
+    return GlobPlan(
+        start=tuple(start),
+        recursive=len(start) < len(directories),
+        name_regex=re.compile(translate(name), GITIGNORE_FLAGS)
+    )
+
+
+def _union_names(plans: List[GlobPlan]) -> Callable[[str], Optional[Match]]:
+    """Combine the name regexes of several plans into one matcher.
+    
+    Args:
+        plans: Plans whose file names should be matched together
+        
+    Returns:
+        `match` of a single regex that accepts any of the plans' names
+    """
+    if len(plans) == 1:
+        return plans[0].name_regex.match
+    return re.compile('|'.join(plan.name_regex.pattern for plan in plans), GITIGNORE_FLAGS).match
+
+
+def _walk_globs(
+    base: Path,
+    start: Tuple[str, ...],
+    plan_sets: List[List[GlobPlan]],
+    prune: Optional[GitignoreMatcher] = None
+) -> Iterator[Tuple[int, Path]]:
+    """Walk once for several sets of plans sharing a start directory.
+    
+    Each set (e.g. the include and the exclude globs) gets its own name
+    matcher, so one traversal classifies every file for all of them. All
+    plans match names in the start directory; only recursive plans match
+    below it, so subdirectories are entered only if one exists.
+    
+    Args:
+        base: Base directory the patterns are relative to
+        start: Literal leading segments shared by the plans
+        plan_sets: Plans from _compile_glob with this start, one list per set
+        prune: Gitignore matcher whose fully ignored directories are skipped
+        
+    Yields:
+        (set index, path) for every set with a plan matching a file
+        (including symlinks to files)
+    """
+    top = [(index, _union_names(plans)) for index, plans in enumerate(plan_sets) if plans]
+    deep = []
+    for index, plans in enumerate(plan_sets):
+        recursive = [plan for plan in plans if plan.recursive]
+        if recursive:
+            deep.append((index, _union_names(recursive)))
+    
+    stack = [(os.path.join(str(base), *start), top)]
+    
+    while stack:
+        directory, matchers = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # Both answers come from the cached d_type except for symlinks
+                    try:
+                        is_file = entry.is_file()
+                        is_dir = not is_file and entry.is_dir()
+                    except OSError:
+                        continue
+                    
+                    if is_file:
+                        path = None
+                        for index, name_match in matchers:
+                            if name_match(entry.name):
+                                if path is None:
+                                    path = Path(entry.path)
+                                yield index, path
+                    elif is_dir and deep and not entry.is_symlink():
+                        # Skip subtrees gitignore would discard anyway
+                        if prune is None or not prune.prunes(entry.name):
+                            stack.append((entry.path, deep))
+        except OSError:
+            # Missing or unreadable directory, as Path.glob ignores them
+            continue
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_gitignore(patterns: Tuple[str, ...]) -> GitignoreMatcher:
+    """Group gitignore patterns by rule and compile each group once.
+    
+    Args:
+        patterns: Patterns from .gitignore
+        
+    Returns:
+        GitignoreMatcher with one PatternGroup per rule
+    """
+    dir_patterns = []
+    root_patterns = []
+    float_patterns = []
+    
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            dir_patterns.append(pattern[:-1])
+        elif pattern.startswith('/'):
+            root_patterns.append(pattern[1:])
+        else:
+            float_patterns.append(pattern)
+    
+    return GitignoreMatcher(
+        dirs=_compile_pattern_group(dir_patterns),
+        root=_compile_pattern_group(root_patterns),
+        floats=_compile_pattern_group(float_patterns),
+    )
+
+
 class FileDiscovery:
     """Handles file discovery and filtering."""
     
@@ -78,14 +505,8 @@ class FileDiscovery:
         if filepath.suffix.lower() in self.BINARY_EXTENSIONS:
             return True
         
-        # Try mimetype detection
-        mime_type, _ = mimetypes.guess_type(str(filepath))
-        if mime_type:
-            # Text files typically start with 'text/'
-            return not mime_type.startswith('text/')
-        
-        # Default to treating as text if unsure
-        return False
+        # Try mimetype detection (cached per suffix chain)
+        return _mime_is_binary(''.join(filepath.suffixes))
     
     def _load_gitignore_patterns(self, base_path: Path) -> List[str]:
         """
@@ -99,9 +520,7 @@ class FileDiscovery:
         """
         gitignore_path = base_path / '.gitignore'
         
-        if not gitignore_path.exists():
-            return []
-        
+        # Opening directly answers existence too; a missing file is the common case
         try:
             with gitignore_path.open('r') as f:
                 return [
@@ -109,7 +528,9 @@ class FileDiscovery:
                     for line in f
                     if line.strip() and not line.strip().startswith('#')
                 ]
-        except (FileNotFoundError, PermissionError) as e:
+        except FileNotFoundError:
+            return []
+        except PermissionError as e:
             logging.debug(f"Could not read .gitignore: {e}")
             return []
     
@@ -122,37 +543,79 @@ class FileDiscovery:
             base_path: The base directory (where .gitignore is)
             gitignore_patterns: List of patterns from .gitignore
             
+        Returns:
+            True if file should be ignored
+        """
+        return self._is_gitignored_fast(
+            filepath, base_path, _compile_gitignore(tuple(gitignore_patterns))
+        )
+    
+    def _is_gitignored_fast(
+        self,
+        filepath: Path,
+        base_path: Path,
+        matcher: GitignoreMatcher,
+        parent_cache: Optional[Dict[Tuple[str, ...], bool]] = None
+    ) -> bool:
+        """
+        Check a file against gitignore patterns that were compiled up front.
+        
+        Args:
+            filepath: The file to check
+            base_path: The base directory (where .gitignore is)
+            matcher: Compiled patterns from _compile_gitignore
+            parent_cache: Per-directory results shared across calls, keyed by parent parts
+            
         Returns:
             True if file should be ignored
         """
         try:
             relative_path = filepath.relative_to(base_path)
-            relative_str = str(relative_path)
-            path_parts = relative_path.parts
-            
-            for pattern in gitignore_patterns:
-                # Handle directory patterns (ending with /)
-                if pattern.endswith('/'):
-                    pattern_name = pattern[:-1]
-                    # Check if any part of the path matches
-                    if any(fnmatch(part, pattern_name) for part in path_parts):
-                        return True
-                # Handle patterns starting with / (root-only match)
-                elif pattern.startswith('/'):
-                    if fnmatch(relative_str, pattern[1:]):
-                        return True
-                else:
-                    # Match anywhere in path
-                    if fnmatch(relative_str, pattern):
-                        return True
-                    # Check if any parent directory matches
-                    if any(fnmatch(part, pattern) for part in path_parts[:-1]):
-                        return True
         except ValueError:
             # filepath is not relative to base_path
-            pass
+            return False
         
-        return False
+        return self._is_gitignored_precomputed(
+            str(relative_path), relative_path.parts, matcher, parent_cache
+        )
+    
+    def _is_gitignored_precomputed(
+        self,
+        relative_str: str,
+        path_parts: Tuple[str, ...],
+        matcher: GitignoreMatcher,
+        parent_cache: Optional[Dict[Tuple[str, ...], bool]] = None
+    ) -> bool:
+        """
+        Check a file, given as its path relative to the gitignore's directory.
+        
+        Args:
+            relative_str: Relative path string
+            path_parts: Parts of the relative path
+            matcher: Compiled patterns from _compile_gitignore
+            parent_cache: Per-directory results shared across calls, keyed by parent parts
+            
+        Returns:
+            True if file should be ignored
+        """
+        # Directory and floating patterns both ignore a file when a parent
+        # part matches; that answer is shared by every file in a directory
+        parents = path_parts[:-1]
+        parent_ignored = parent_cache.get(parents) if parent_cache is not None else None
+        if parent_ignored is None:
+            parent_ignored = any(map(matcher.prunes, parents))
+            if parent_cache is not None:
+                parent_cache[parents] = parent_ignored
+        if parent_ignored:
+            return True
+        
+        # Handle directory patterns (ending with /) against the name itself
+        if path_parts and matcher.dirs.matches(path_parts[-1]):
+            return True
+        
+        # Handle patterns starting with / (root-only match) and patterns
+        # matching anywhere in path
+        return matcher.root.matches(relative_str) or matcher.floats.matches(relative_str)
     
     def _file_contains_pattern(self, filepath: Path, pattern: str) -> bool:
         """
@@ -165,131 +628,311 @@ class FileDiscovery:
         Returns:
             True if pattern is found in file content
         """
-        if self.is_binary_file(filepath):
+        # Extension set first: no allocation beyond the suffix
+        if filepath.suffix.lower() in self.BINARY_EXTENSIONS:
+            return False
+        
+        # Mimetype fallback is a cache hit for any suffix chain seen before
+        if _mime_is_binary(''.join(filepath.suffixes)):
             return False
         
         try:
-            # Compile pattern with error handling
-            try:
-                compiled_pattern = re.compile(pattern, re.MULTILINE | re.IGNORECASE)
-            except re.error as e:
-                # If pattern is invalid regex, try literal search
-                logging.debug(f"Invalid regex pattern '{pattern}': {e}. Using literal search.")
-                pattern = re.escape(pattern)
-                compiled_pattern = re.compile(pattern, re.MULTILINE | re.IGNORECASE)
-            
-            with filepath.open('r', encoding='utf-8') as f:
-                # Read in chunks for large files
-                chunk_size = 8192
-                
-                while chunk := f.read(chunk_size):
-                    if compiled_pattern.search(chunk):
-                        return True
-                return False
+            return _search_content(filepath.read_bytes(), _compile_content(pattern), _compile_content_bytes(pattern))
         except (UnicodeDecodeError, PermissionError) as e:
             logging.debug(f"Could not read {filepath}: {e}")
             return False
     
-    def _gather_files_by_glob(self, base: Path, patterns: List[str]) -> Set[Path]:
+    def _gather_files_by_glob(self, base: Path, patterns: List[str], prune: Optional[GitignoreMatcher] = None) -> Set[Path]:
         """Gather all files matching the given glob patterns.
         
         Args:
             base: Base path to search from
             patterns: List of glob patterns
+            prune: Gitignore matcher used to skip ignored directories while walking
             
         Returns:
             Set of matching file paths
         """
-        files = set()
+        return self._gather_glob_sets(base, [patterns], prune)[0]
+    
+    def _gather_glob_sets(
+        self,
+        base: Path,
+        pattern_sets: List[List[str]],
+        prune: Optional[GitignoreMatcher] = None
+    ) -> List[Set[Path]]:
+        """Gather the files for several lists of glob patterns in one traversal.
         
-        for pattern in patterns:
+        Args:
+            base: Base path to search from
+            pattern_sets: Lists of glob patterns, e.g. includes and excludes
+            prune: Gitignore matcher used to skip ignored directories while walking
+            
+        Returns:
+            One set of matching file paths per pattern list
+        """
+        results: List[Set[Path]] = [set() for _ in pattern_sets]
+        plans: Dict[Tuple[str, ...], List[List[GlobPlan]]] = {}
+        
+        # Stat the base once, not once per pattern
+        base_is_dir = base.is_dir()
+        base_is_file = not base_is_dir and base.is_file()
+        
+        for index, patterns in enumerate(pattern_sets):
+            files = results[index]
+            for pattern in patterns:
+                try:
+                    if base_is_dir:
+                        # A pattern without wildcards names one path; check it directly
+                        if (
+                            pattern and GLOB_MAGIC_CHARS.isdisjoint(pattern)
+                            and not os.path.isabs(pattern) and not os.path.splitdrive(pattern)[0]
+                        ):
+                            candidate = base / pattern
+                            if candidate.is_file():
+                                files.add(candidate)
+                            continue
+                        
+                        plan = _compile_glob(pattern)
+                        if plan is None:
+                            files.update(p for p in base.glob(pattern) if p.is_file())
+                        else:
+                            # Walked below, once per start directory for all lists
+                            plans.setdefault(plan.start, [[] for _ in pattern_sets])[index].append(plan)
+                    elif base_is_file and base.match(pattern):
+                        files.add(base)
+                except Exception as e:
+                    logging.debug(f"Error with pattern '{pattern}': {e}")
+        
+        for start, plan_sets in plans.items():
             try:
-                if base.is_dir():
-                    matches = base.glob(pattern)
-                    files.update(p for p in matches if p.is_file())
-                elif base.is_file() and base.match(pattern):
-                    files.add(base)
+                for index, path in _walk_globs(base, start, plan_sets, prune):
+                    results[index].add(path)
             except Exception as e:
-                logging.debug(f"Error with pattern '{pattern}': {e}")
+                logging.debug(f"Error walking '{'/'.join(start) or '.'}': {e}")
         
-        return files
+        return results
+    
+    def _filter_by_content(self, files: Set[Path], pattern: str) -> List[Path]:
+        """Keep the files whose content matches a pattern, searching in parallel.
+        
+        Args:
+            files: Candidate file paths
+            pattern: Regular expression pattern to search for
+            
+        Returns:
+            Files that contain the pattern
+        """
+        if not files:
+            return []
+        
+        candidates = list(files)
+        
+        # Content search is read-bound, so threads overlap the file I/O
+        with ThreadPoolExecutor(max_workers=min(IO_WORKERS, len(candidates))) as executor:
+            matches = executor.map(lambda path: self._file_contains_pattern(path, pattern), candidates)
+            return [path for path, found in zip(candidates, matches) if found]
+    
+    def _matches_plan(self, base: Path, filepath: Path, plan: GlobPlan) -> bool:
+        """Whether Path.glob of a plan's pattern would return `filepath`.
+        
+        Args:
+            base: Base directory the pattern is relative to
+            filepath: File under base
+            plan: Plan from _compile_glob
+            
+        Returns:
+            True if the file matches the pattern
+        """
+        try:
+            parts = filepath.relative_to(base).parts
+        except ValueError:
+            return False
+        
+        depth = len(plan.start)
+        if len(parts) <= depth or parts[:depth] != plan.start or not plan.name_regex.match(parts[-1]):
+            return False
+        if len(parts) == depth + 1:
+            return True
+        if not plan.recursive:
+            return False
+        
+        # '**' never descends into symlinked directories
+        directory = os.path.join(str(base), *plan.start)
+        for part in parts[depth:-1]:
+            directory = os.path.join(directory, part)
+            if os.path.islink(directory):
+                return False
+        return True
     
-    def _gather_files_by_content(self, base: Path, patterns: List[PatternParts]) -> Set[Path]:
+    def _glob_subset(self, base: Path, files: Set[Path], pattern: str, prune: Optional[GitignoreMatcher] = None) -> Set[Path]:
+        """Return the files in `files` that a glob pattern matches.
+        
+        Small sets are matched in memory; otherwise, or when the pattern can
+        only go through Path.glob, the tree is gathered and intersected.
+        
+        Args:
+            base: Base path to search from
+            files: Files to select from
+            pattern: Glob pattern
+            prune: Gitignore matcher used to skip ignored directories while walking
+            
+        Returns:
+            Subset of `files` matching the pattern
+        """
+        plan = _compile_glob(pattern)
+        if plan is not None and len(files) < GLOB_SUBSET_THRESHOLD and base.is_dir():
+            return {f for f in files if self._matches_plan(base, f, plan)}
+        return files & self._gather_files_by_glob(base, [pattern], prune)
+    
+    def _gather_files_by_content(
+        self,
+        base: Path,
+        patterns: List[PatternParts],
+        prune: Optional[GitignoreMatcher] = None,
+        glob_sets: Optional[List[Set[Path]]] = None
+    ) -> Set[Path]:
         """Gather files matching glob patterns that contain specific content.
         
         Args:
             base: Base path to search from
             patterns: List of PatternParts with glob and content
+            prune: Gitignore matcher used to skip ignored directories while walking
+            glob_sets: Files already gathered for each pattern's glob, if known
             
         Returns:
             Set of matching file paths
         """
         files = set()
         
-        for pattern_parts in patterns:
-            glob_files = self._gather_files_by_glob(base, [pattern_parts.glob])
-            
-            for filepath in glob_files:
-                if self._file_contains_pattern(filepath, pattern_parts.content):
-                    files.add(filepath)
+        if glob_sets is None:
+            glob_sets = self._gather_glob_sets(base, [[p.glob] for p in patterns], prune)
+        
+        for pattern_parts, glob_files in zip(patterns, glob_sets):
+            files.update(self._filter_by_content(glob_files, pattern_parts.content))
         
         return files
     
-    def _filter_gitignored(self, files: Set[Path], base: Path, patterns: List[str]) -> Set[Path]:
+    def _filter_gitignored(self, files: Iterable[Path], base: Path, patterns: List[str]) -> Iterator[Path]:
         """Filter out gitignored files.
         
         Args:
-            files: Set of file paths to filter
+            files: File paths to filter
             base: Base directory
             patterns: Gitignore patterns
             
-        Returns:
-            Filtered set of files
+        Yields:
+            Files that are not ignored, in input order
         """
         if not patterns:
-            return files
+            yield from files
+            return
+        
+        # Compile once for the whole batch instead of per file
+        matcher = _compile_gitignore(tuple(patterns))
+        parent_cache: Dict[Tuple[str, ...], bool] = {}
         
-        filtered = {f for f in files if not self._is_gitignored(f, base, patterns)}
+        # Gathered paths are spelled with base as a literal prefix, so the
+        # relative path is a slice; anything else is not under base and is
+        # never ignored
+        prefix = os.path.join(str(base), '')
+        cut = len(prefix)
+        ignored_count = 0
+        for f in files:
+            path_str = str(f)
+            if not path_str.startswith(prefix):
+                yield f
+                continue
+            
+            relative_str = path_str[cut:]
+            if self._is_gitignored_precomputed(relative_str, tuple(relative_str.split(os.sep)), matcher, parent_cache):
+                ignored_count += 1
+            else:
+                yield f
         
-        ignored_count = len(files) - len(filtered)
         if ignored_count > 0:
             logging.info(f"Ignored {ignored_count} files based on .gitignore patterns")
+    
+    def _validate_one(self, path: Path) -> Optional[str]:
+        """Run a file through the validation stages, cheapest first.
+        
+        Each stage only sees files that passed the previous ones: the
+        extension and mimetype checks need no I/O, and a single sniff read
+        then answers emptiness, binary content and readability.
+        
+        Args:
+            path: File path to validate
+            
+        Returns:
+            Name of the stage that rejected the file, or None if it is valid
+        """
+        if path.suffix.lower() in self.BINARY_EXTENSIONS:
+            logging.debug(f"Skipping binary file: {path}")
+            return 'binary extension'
+        
+        if _mime_is_binary(''.join(path.suffixes)):
+            logging.debug(f"Skipping binary file: {path}")
+            return 'binary mimetype'
+        
+        try:
+            with path.open('rb') as f:
+                head = f.read(SNIFF_SIZE)
+            
+            if not head:
+                logging.debug(f"Skipping empty file: {path}")
+                return 'empty'
+            
+            if b'\x00' in head:
+                logging.debug(f"Skipping binary file: {path}")
+                return 'binary content'
+            
+            # Incremental decode tolerates a multi-byte character cut at the end
+            codecs.getincrementaldecoder('utf-8')().decode(head)
+        except (PermissionError, UnicodeDecodeError) as e:
+            logging.debug(f"Skipping unreadable file {path}: {e}")
+            return 'unreadable'
         
-        return filtered
+        return None
     
-    def _validate_files(self, files: Set[Path]) -> List[Path]:
+    def _validate_files(self, files: Iterable[Path]) -> List[Path]:
         """Validate and filter files for readability and content.
         
         Args:
-            files: Set of file paths to validate
+            files: File paths to validate, consumed once
             
         Returns:
             Sorted list of valid file paths
         """
         valid_files = []
+        rejected: Counter = Counter()
         
-        for path in files:
-            # Skip binary files
-            if self.is_binary_file(path):
-                logging.debug(f"Skipping binary file: {path}")
-                continue
-            
-            try:
-                # Check if file is empty
-                if path.stat().st_size == 0:
-                    logging.debug(f"Skipping empty file: {path}")
-                    continue
-                
-                # Verify readability
-                with path.open('r', encoding='utf-8') as f:
-                    # Just try to read first byte to verify
-                    f.read(1)
-                
+        def collect(path: Path, stage: Optional[str]) -> None:
+            if stage is None:
                 valid_files.append(path)
-            except (PermissionError, UnicodeDecodeError) as e:
-                logging.debug(f"Skipping unreadable file {path}: {e}")
+            else:
+                rejected[stage] += 1
         
-        return sorted(valid_files)
+        # Overlap the per-file syscalls, which dominate on large or network
+        # trees, submitting in a bounded window rather than all up front
+        with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+            pending: deque = deque()
+            for path in files:
+                if len(pending) >= VALIDATE_WINDOW:
+                    done_path, future = pending.popleft()
+                    collect(done_path, future.result())
+                pending.append((path, executor.submit(self._validate_one, path)))
+            
+            while pending:
+                done_path, future = pending.popleft()
+                collect(done_path, future.result())
+        
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            total = len(valid_files) + sum(rejected.values())
+            logging.debug(f"Validation kept {len(valid_files)} of {total} files; rejected by stage: {dict(rejected)}")
+        
+        # The only full list is the one returned
+        valid_files.sort()
+        return valid_files
 
     def find_files(self, base_path: str, include_patterns: List[str], exclude_patterns: Optional[List[str]] = None, respect_gitignore: bool = True) -> Tuple[List[Path], List[str]]:
         """
@@ -319,30 +962,43 @@ class FileDiscovery:
             include_globs, include_content = self._parse_patterns(include_patterns)
             exclude_globs, exclude_content = self._parse_patterns(exclude_patterns)
             
+            # Load gitignore up front so ignored directories are never walked
+            use_gitignore = respect_gitignore and base.is_dir()
+            gitignore_patterns = []
+            prune = None
+            if use_gitignore:
+                gitignore_patterns = self._load_gitignore_patterns(base)
+                if gitignore_patterns:
+                    prune = _compile_gitignore(tuple(gitignore_patterns))
+            
+            # One traversal gathers the include globs, the exclude globs and
+            # the glob of every content-search include
+            glob_sets = self._gather_glob_sets(
+                base, [include_globs, exclude_globs] + [[p.glob] for p in include_content], prune
+            )
+            
             # Gather files by pattern type
-            included_files = self._gather_files_by_glob(base, include_globs)
-            included_files.update(self._gather_files_by_content(base, include_content))
+            included_files = glob_sets[0]
+            included_files.update(self._gather_files_by_content(base, include_content, prune, glob_sets[2:]))
             
             # Handle exclusions
-            excluded_files = self._gather_files_by_glob(base, exclude_globs)
+            excluded_files = glob_sets[1]
             
             # For content-based exclusions, only exclude from included files
             if exclude_content:
                 content_excluded = set()
                 for pattern in exclude_content:
                     # Only check files that are already included
-                    candidates = included_files & self._gather_files_by_glob(base, [pattern.glob])
-                    for filepath in candidates:
-                        if self._file_contains_pattern(filepath, pattern.content):
-                            content_excluded.add(filepath)
+                    candidates = self._glob_subset(base, included_files, pattern.glob, prune)
+                    content_excluded.update(self._filter_by_content(candidates, pattern.content))
                 excluded_files.update(content_excluded)
             
-            # Apply exclusions
-            final_files = included_files - excluded_files
+            # Apply exclusions lazily; the remaining stages stream each file
+            # through instead of building a set per stage
+            final_files: Iterable[Path] = (f for f in included_files if f not in excluded_files)
             
             # Filter gitignored files if requested
-            if respect_gitignore and base.is_dir():
-                gitignore_patterns = self._load_gitignore_patterns(base)
+            if use_gitignore:
                 final_files = self._filter_gitignored(final_files, base, gitignore_patterns)
             
             # Validate and sort files
@@ -1,19 +1,28 @@
 """Strategic compression planning module."""
 
+import functools
+import hashlib
 import json
 import logging
+import math
 import os
-from typing import List, Tuple, Dict, Any, Optional
-from dotenv import load_dotenv
-from litellm import completion
+import random
+import time
+from typing import List, Tuple, Dict, Any, Optional, NamedTuple, Callable
 
-# Load environment variables
-load_dotenv()
+# Suppress litellm warnings before it is imported
+from ._bootstrap import bootstrap_once
+from .tokenizer import Tokenizer
 
-# Suppress litellm's verbose logging
-logging.getLogger("LiteLLM").setLevel(logging.WARNING)
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
+try:
+    import numpy as np
+except ImportError:  # optional: large plans are estimated in pure Python
+    np = None
+
+try:
+    import orjson
+except ImportError:  # optional: plans are parsed with the json module
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -26,29 +35,105 @@ TIER_NAMES: Dict[int, str] = {
 # Minimum token size for compressed files
 MIN_COMPRESSED_TOKENS = 100
 
+# Plans with at least this many files are estimated with NumPy when available
+NUMPY_MIN_FILES = 64
 
-def get_planner_prompt(file_count: int, total_tokens: int, budget: int, fixed_section: str, file_list: str) -> str:
-    """Generate the planner prompt with the given parameters.
+# Tiers the local solver chooses from, least compressed first
+PLAN_TIERS: Tuple[int, ...] = (100, 95, 85, 50, 10, 0)
+
+# Value the local solver assigns a file at each tier; concave, so lighter
+# compression across many files beats reducing a few files to a summary
+TIER_VALUES: Dict[int, float] = {100: 1.0, 95: 0.98, 85: 0.93, 50: 0.75, 10: 0.45, 0: 0.15}
+
+# Largest file count planned locally by the knapsack solver; bigger plans
+# go to the LLM planner
+DP_MAX_FILES = 300
+
+# Widest knapsack table; budgets up to this many tokens are solved with
+# exact costs, larger ones in buckets of budget / DP_MAX_BUCKETS tokens
+DP_MAX_BUCKETS = 2000
+
+# Path parts that mark a file as less important to keep verbatim
+LOW_IMPORTANCE_PARTS = frozenset({
+    'test', 'tests', 'testing', 'spec', 'specs', '__tests__',
+    'docs', 'doc', 'examples', 'example', 'benchmarks', 'fixtures',
+})
+
+# Planner model turns before an over-budget plan is returned as is
+PLANNER_MAX_ROUNDS = 3
+
+# Attempts per planner request on rate limits and transient API errors,
+# with exponential backoff capped at PLANNER_MAX_BACKOFF seconds
+PLANNER_MAX_ATTEMPTS = 6
+PLANNER_MAX_BACKOFF = 60
+
+# Token counts are rounded to this step in plan cache keys, so small edits
+# to a file keep hitting the cached plan
+TOKEN_QUANTUM = 64
+
+# Where validated plans are kept between runs, one JSON file per input hash
+PLAN_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "fitcode2prompt", "plans")
+
+
+def _json_loads(data: Any) -> Any:
+    """Parse JSON text or bytes, with orjson when it is installed.
+    
+    Both parsers raise a ValueError subclass on invalid input.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Serialize a value to UTF-8 JSON bytes, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+def _quantize_tokens(tokens: int) -> int:
+    """Round a token count to the nearest multiple of TOKEN_QUANTUM."""
+    return (tokens + TOKEN_QUANTUM // 2) // TOKEN_QUANTUM * TOKEN_QUANTUM
+
+
+class StreamedReply(NamedTuple):
+    """Planner turn assembled from a streamed completion."""
+    content: Optional[str]         # reasoning text sent before the tool call
+    tool_call_id: Optional[str]    # id of the first tool call, if any
+    arguments: Optional[str]       # complete JSON arguments of that call
+
+
+@functools.lru_cache(maxsize=65536)
+def _estimate_file_tokens(original_tokens: int, tier: int) -> int:
+    """Estimate compressed tokens for a file at given tier.
+    
+    Memoized per (original_tokens, tier): the knapsack solver and plan
+    validation ask for the same pairs many times.
     
     Args:
-        file_count: Total number of files
-        total_tokens: Total token count
-        budget: Token budget
-        fixed_section: Section describing fixed compression files
-        file_list: List of files to plan for
+        original_tokens: Original file token count
+        tier: Compression tier
         
     Returns:
-        Formatted prompt string
+        Estimated token count after compression
     """
-    return f"""You are a code compression strategist. Create a compression plan that fits within the token budget.
+    if tier == 0:
+        # Max compression: minimum of 100 or original size
+        return min(MIN_COMPRESSED_TOKENS, original_tokens)
+    elif tier == 100:
+        # No compression
+        return original_tokens
+    else:
+        # Calculate with minimum threshold
+        calculated = int(original_tokens * tier / 100)
+        return min(max(MIN_COMPRESSED_TOKENS, calculated), original_tokens)
 
-Input:
-- Total files: {file_count}
-- Total tokens: {total_tokens:,}
-- Budget: {budget:,} tokens maximum
-{fixed_section}
-Files to plan compression for:
-{file_list}
+
+# Planner instructions, identical for every request. They are sent as the
+# system message ahead of the per-request numbers and file list so providers
+# with automatic prompt caching can reuse the prefix across runs.
+PLANNER_SYSTEM_PROMPT = """You are a code compression strategist. Create a compression plan that fits within the token budget.
 
 Compression levels:
 - 100: No compression
@@ -57,6 +142,8 @@ Compression levels:
 - 10: Heavy compression
 - 0: Replace file with 1-3 sentence description
 
+Files are listed one per line as `path<TAB>token_count`, where token_count is an integer. Files with user-specified compression are listed as `path<TAB>token_count<TAB>level`.
+
 First, explain your compression strategy in 1-2 sentences. Consider file importance based on paths (core files vs tests vs interfaces).
 
 Then create your compression plan using the validate_budget function. The function will return:
@@ -66,17 +153,97 @@ Then create your compression plan using the validate_budget function. The functi
 Keep adjusting and validating until you get true."""
 
 
+# validate_budget tool offered to the planner model. Built once, so the
+# non-file part of every planner request is byte-identical across calls.
+VALIDATE_BUDGET_TOOLS: List[Dict[str, Any]] = [{
+    "type": "function",
+    "function": {
+        "name": "validate_budget",
+        "description": "Validate that the compression plan fits within budget. Automatically applies 100 token minimum to all compressed files. Returns true if within budget, false if over budget",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "files": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string"},
+                            "original_tokens": {"type": "integer"},
+                            "tier": {"type": "integer", "enum": [100, 95, 85, 50, 10, 0]}
+                        },
+                        "required": ["path", "original_tokens", "tier"]
+                    }
+                }
+            },
+            "required": ["files"]
+        }
+    }
+}]
+
+
+def get_planner_prompt(file_count: int, total_tokens: int, budget: int, fixed_section: str, file_list: str) -> str:
+    """Generate the per-request part of the planner prompt.
+    
+    The static instructions live in PLANNER_SYSTEM_PROMPT; this only holds
+    what changes between requests.
+    
+    Args:
+        file_count: Total number of files
+        total_tokens: Total token count
+        budget: Token budget
+        fixed_section: Section describing fixed compression files
+        file_list: List of files to plan for
+        
+    Returns:
+        Formatted prompt string
+    """
+    return f"""Request:
+
+Input:
+- Total files: {file_count}
+- Total tokens: {total_tokens:,}
+- Budget: {budget:,} tokens maximum
+{fixed_section}
+Files to plan compression for:
+{file_list}"""
+
+
 class Planner:
     """Strategic planner for compression strategies."""
 
-    def __init__(self, model: str):
+    def __init__(self, model: str, use_cache: bool = True, cache_dir: Optional[str] = None):
         """
         Initialize the planner.
 
         Args:
             model: LLM model to use for planning (required)
+            use_cache: Reuse plans from earlier runs with identical inputs (default: True)
+            cache_dir: Directory for cached plans (default: ~/.cache/fitcode2prompt/plans)
         """
+        bootstrap_once()
         self.model = model
+        self.use_cache = use_cache
+        self.cache_dir = cache_dir or PLAN_CACHE_DIR
+        # Created on first count_tokens() call; planning itself never needs it
+        self._tokenizer = None
+    
+    def count_tokens(self, texts: List[str]) -> List[int]:
+        """Count tokens exactly with tiktoken, for callers building `files`.
+        
+        Uses the planner model's encoding (cl100k_base for unknown models)
+        and encodes all texts in one batch. Exact counts make the local
+        solver's plans fit the budget without a model round trip.
+        
+        Args:
+            texts: File contents
+            
+        Returns:
+            Token count per text, in input order
+        """
+        if self._tokenizer is None:
+            self._tokenizer = Tokenizer(self.model)
+        return self._tokenizer.count_tokens_batch(texts)
     
     def make_plan(
         self,
@@ -84,17 +251,21 @@ class Planner:
         budget: int,
         buffer_percent: int = 10,
         verbose: bool = False,
-        fixed_files: List[Dict[str, Any]] = None
+        fixed_files: List[Dict[str, Any]] = None,
+        strategy: str = "dp"
     ) -> Dict[str, Any]:
         """
         Generate a compression plan that fits the codebase within token budget.
 
         Args:
-            files: List of (filepath, token_count) tuples
+            files: List of (filepath, token_count) tuples; counts should be exact
+                tiktoken counts (see count_tokens), not character estimates
             budget: Maximum allowed tokens in final output
             buffer_percent: Percentage to reduce budget by for safety margin (default: 10%)
             verbose: Enable verbose logging
             fixed_files: List of files with fixed compression (dict with path, original_tokens, tier)
+            strategy: "dp" to solve plans of up to DP_MAX_FILES files locally,
+                "llm" to always ask the planner model (default: "dp")
 
         Returns:
             Dictionary containing the compression plan
@@ -111,14 +282,354 @@ class Planner:
         if verbose:
             self._log_planning_details(files, fixed_files, budget, effective_budget, fixed_tokens, remaining_budget, buffer_percent)
         
+        # Trivial answers need neither the solver nor the model
+        total_planner_tokens = sum(tokens for _, tokens in files)
+        if total_planner_tokens <= remaining_budget:
+            plan_files = [{"path": path, "original_tokens": tokens, "tier": 100} for path, tokens in files]
+            result = self._build_plan_result(
+                {"files": plan_files}, files, fixed_files, fixed_tokens, total_planner_tokens,
+                budget, effective_budget, buffer_percent,
+                "All files fit within budget; no compression needed."
+            )
+            if verbose:
+                self._log_plan_result(result, budget)
+            return result
+        
+        if sum(_estimate_file_tokens(tokens, 0) for _, tokens in files) > remaining_budget:
+            return self._create_error_result(
+                "Budget is too small even with maximum compression for every file"
+            )
+        
+        # Small plans are solved exactly without a model call
+        if self.uses_local_solver(len(files), strategy):
+            result = self._plan_with_knapsack(
+                files, fixed_files, fixed_tokens, remaining_budget, budget, effective_budget, buffer_percent
+            )
+            if result is not None:
+                if verbose:
+                    self._log_plan_result(result, budget)
+                return result
+            logger.info("Local solver found no plan within budget; asking the planner model")
+        
+        # Identical inputs get the plan a previous run already validated
+        cache_key = None
+        if self.use_cache:
+            cache_key = self._plan_cache_key(files, budget, buffer_percent, fixed_files)
+            cached = self._load_cached_plan(cache_key)
+            if cached is not None:
+                result = self._refresh_cached_plan(
+                    cached, files, fixed_files, fixed_tokens, budget, effective_budget, buffer_percent
+                )
+                if result is not None:
+                    if verbose:
+                        logger.info(f"Using cached plan {cache_key[:12]}")
+                    return result
+        
         # Step 4: Generate prompt for LLM
         prompt = self._generate_planner_prompt(files, fixed_files, fixed_tokens, remaining_budget, budget, effective_budget)
         
         # Step 5: Get compression plan from LLM
         result = self._get_plan_from_llm(prompt, effective_budget, files, fixed_files, fixed_tokens, buffer_percent, budget, verbose)
         
+        # Only plans that parsed and fit the budget are worth replaying; an
+        # over-budget plan from the last round is still returned, not stored
+        if (
+            cache_key is not None
+            and result.get("valid")
+            and result["total_estimated"] <= effective_budget
+        ):
+            self._store_plan(cache_key, result)
+        
         return result
     
+    def uses_local_solver(self, file_count: int, strategy: str = "dp") -> bool:
+        """Whether make_plan solves a plan of this size without the LLM.
+        
+        Args:
+            file_count: Number of files to plan
+            strategy: Planning strategy passed to make_plan
+            
+        Returns:
+            True if the knapsack solver handles the plan
+        """
+        return strategy == "dp" and file_count <= DP_MAX_FILES
+    
+    def _plan_with_knapsack(
+        self,
+        files: List[Tuple[str, int]],
+        fixed_files: List[Dict[str, Any]],
+        fixed_tokens: int,
+        remaining_budget: int,
+        budget: int,
+        effective_budget: int,
+        buffer_percent: int
+    ) -> Optional[Dict[str, Any]]:
+        """Build a plan result from the knapsack solver.
+        
+        Args:
+            files: Files for planner
+            fixed_files: Files with fixed compression
+            fixed_tokens: Tokens for fixed files
+            remaining_budget: Budget left after fixed files
+            budget: Original budget
+            effective_budget: Budget after buffer
+            buffer_percent: Buffer percentage
+            
+        Returns:
+            Plan result dictionary, or None if the solver found no plan
+        """
+        tiers = self._solve_knapsack(files, remaining_budget)
+        if tiers is None:
+            return None
+        
+        plan_files = [
+            {"path": path, "original_tokens": tokens, "tier": tier}
+            for (path, tokens), tier in zip(files, tiers)
+        ]
+        total_estimated, _ = self._calculate_estimated_tokens(plan_files)
+        
+        kept = sum(1 for tier in tiers if tier == 100)
+        reasoning = (
+            f"Solved locally as a knapsack over {len(files)} files: {kept} kept "
+            f"uncompressed, the rest compressed as little as the budget allows, "
+            f"favoring source files over tests, docs and examples."
+        )
+        
+        return self._build_plan_result(
+            {"files": plan_files}, files, fixed_files, fixed_tokens,
+            total_estimated, budget, effective_budget, buffer_percent, reasoning
+        )
+    
+    def _file_importance(self, path: str) -> float:
+        """Heuristic weight of keeping a file close to its original form.
+        
+        Args:
+            path: File path
+            
+        Returns:
+            Weight; tests, docs and examples count half as much as other files
+        """
+        parts = path.replace("\\", "/").lower().split("/")
+        name = parts[-1]
+        if (
+            LOW_IMPORTANCE_PARTS.intersection(parts[:-1])
+            or name.startswith("test_")
+            or name.endswith(("_test.py", ".test.js", ".test.ts", ".spec.js", ".spec.ts"))
+        ):
+            return 0.5
+        return 1.0
+    
+    def _solve_knapsack(self, files: List[Tuple[str, int]], budget: int) -> Optional[List[int]]:
+        """Pick one tier per file maximizing importance-weighted retention.
+        
+        Multiple-choice knapsack: each file takes exactly one of PLAN_TIERS,
+        costing its _estimate_file_tokens in budget and scoring
+        importance * TIER_VALUES[tier]. Budgets up to DP_MAX_BUCKETS tokens
+        are solved with exact costs. Larger budgets are split into
+        DP_MAX_BUCKETS buckets with costs rounded up, so the plan never
+        exceeds the budget. Rounding up can rule out every plan when many
+        files are small compared to a bucket; the solver then retries with
+        costs rounded down and keeps that plan only if its exact cost fits.
+        
+        Args:
+            files: List of (filepath, token_count) tuples
+            budget: Token budget for these files
+            
+        Returns:
+            Tier per file, in input order, or None if no plan was found
+        """
+        if budget < 0:
+            return None
+        
+        bucket = max(1, math.ceil(budget / DP_MAX_BUCKETS))
+        tiers = self._solve_bucketed(files, budget, bucket, math.ceil)
+        if tiers is None and bucket > 1:
+            tiers = self._solve_bucketed(files, budget, bucket, math.floor)
+            if tiers is not None and sum(
+                _estimate_file_tokens(tokens, tier) for (_, tokens), tier in zip(files, tiers)
+            ) > budget:
+                tiers = None
+        
+        return tiers
+    
+    def _solve_bucketed(
+        self,
+        files: List[Tuple[str, int]],
+        budget: int,
+        bucket: int,
+        rounding: Callable[[float], int]
+    ) -> Optional[List[int]]:
+        """Solve the knapsack with costs counted in buckets of tokens.
+        
+        dp[b] holds the best score using at most b buckets for the files
+        seen so far; one choice row per file is kept for backtracking.
+        
+        Args:
+            files: List of (filepath, token_count) tuples
+            budget: Token budget for these files
+            bucket: Tokens per bucket
+            rounding: math.ceil or math.floor, applied to each cost in buckets
+            
+        Returns:
+            Tier per file, in input order, or None if no plan fits
+        """
+        capacity = budget // bucket
+        unreachable = float("-inf")
+        
+        dp = [0.0] * (capacity + 1)
+        choices: List[bytearray] = []
+        
+        for path, tokens in files:
+            importance = self._file_importance(path)
+            options = [
+                (index, rounding(_estimate_file_tokens(tokens, tier) / bucket), importance * TIER_VALUES[tier])
+                for index, tier in enumerate(PLAN_TIERS)
+            ]
+            
+            best = [unreachable] * (capacity + 1)
+            choice = bytearray(capacity + 1)
+            for index, cost, score in options:
+                if cost > capacity:
+                    continue
+                # Shift the previous row by the option's cost
+                for b in range(cost, capacity + 1):
+                    candidate = dp[b - cost] + score
+                    if candidate > best[b]:
+                        best[b] = candidate
+                        choice[b] = index
+            
+            dp = best
+            choices.append(choice)
+        
+        if dp[capacity] == unreachable:
+            return None
+        
+        # Walk back from the full budget, undoing each file's cost
+        tiers = [0] * len(files)
+        b = capacity
+        for i in range(len(files) - 1, -1, -1):
+            index = choices[i][b]
+            tiers[i] = PLAN_TIERS[index]
+            b -= rounding(_estimate_file_tokens(files[i][1], PLAN_TIERS[index]) / bucket)
+        
+        return tiers
+    
+    def _plan_cache_key(
+        self,
+        files: List[Tuple[str, int]],
+        budget: int,
+        buffer_percent: int,
+        fixed_files: List[Dict[str, Any]]
+    ) -> str:
+        """Hash the planner inputs into a stable cache key.
+        
+        Args:
+            files: List of (filepath, token_count) tuples
+            budget: Maximum allowed tokens
+            buffer_percent: Budget safety margin
+            fixed_files: Files with fixed compression
+            
+        Returns:
+            Hex SHA-256 digest of the inputs, independent of their order and
+            of token count changes within a TOKEN_QUANTUM bucket
+        """
+        # Always the json module, so keys don't change when orjson is installed
+        payload = json.dumps({
+            "model": self.model,
+            "files": sorted((path, _quantize_tokens(tokens)) for path, tokens in files),
+            "budget": budget,
+            "buffer_percent": buffer_percent,
+            "fixed_files": sorted(
+                ({**f, "original_tokens": _quantize_tokens(f["original_tokens"])} for f in fixed_files),
+                key=lambda f: f['path']
+            ),
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _refresh_cached_plan(
+        self,
+        cached: Dict[str, Any],
+        files: List[Tuple[str, int]],
+        fixed_files: List[Dict[str, Any]],
+        fixed_tokens: int,
+        budget: int,
+        effective_budget: int,
+        buffer_percent: int
+    ) -> Optional[Dict[str, Any]]:
+        """Re-apply a cached plan's tiers to the current token counts.
+        
+        The cache key rounds token counts, so the cached plan may carry
+        slightly different sizes than this run. Its tiers are kept, but the
+        counts and totals are rebuilt from the current files.
+        
+        Args:
+            cached: Plan loaded from the cache
+            files: Files for planner, with current token counts
+            fixed_files: Files with fixed compression
+            fixed_tokens: Tokens for fixed files
+            budget: Original budget
+            effective_budget: Budget after buffer
+            buffer_percent: Buffer percentage
+            
+        Returns:
+            Refreshed plan, or None if it no longer fits the budget
+        """
+        tokens_by_path = dict(files)
+        fixed_paths = {f['path'] for f in fixed_files}
+        plan_files = [
+            {"path": f["path"], "original_tokens": tokens_by_path.get(f["path"], f["original_tokens"]), "tier": f["tier"]}
+            for f in cached.get("files", [])
+            if f["path"] not in fixed_paths
+        ]
+        
+        total_estimated, _ = self._calculate_estimated_tokens(plan_files)
+        if total_estimated + fixed_tokens > effective_budget:
+            return None
+        
+        return self._build_plan_result(
+            {"files": plan_files}, files, fixed_files, fixed_tokens,
+            total_estimated, budget, effective_budget, buffer_percent, cached.get("reasoning")
+        )
+    
+    def _load_cached_plan(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load a cached plan, if one exists for the key.
+        
+        Args:
+            key: Cache key from _plan_cache_key
+            
+        Returns:
+            Cached plan dictionary, or None on a miss or unreadable entry
+        """
+        try:
+            with open(os.path.join(self.cache_dir, f"{key}.json"), "rb") as f:
+                return _json_loads(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable cached plan {key}: {e}")
+            return None
+    
+    def _store_plan(self, key: str, plan: Dict[str, Any]) -> None:
+        """Persist a plan under its cache key.
+        
+        The plan is written to a temporary file and renamed into place, so
+        a concurrent or interrupted run never sees a partial entry.
+        
+        Args:
+            key: Cache key from _plan_cache_key
+            plan: Plan dictionary to store
+        """
+        path = os.path.join(self.cache_dir, f"{key}.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(_json_dumps(plan))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # A read-only home directory only costs the next run a planner call
+            logger.debug(f"Could not cache plan {key}: {e}")
+    
     def _calculate_fixed_tokens(self, fixed_files: List[Dict[str, Any]]) -> int:
         """Calculate tokens used by fixed compression files.
         
@@ -143,16 +654,7 @@ class Planner:
         Returns:
             Estimated token count after compression
         """
-        if tier == 0:
-            # Max compression: minimum of 100 or original size
-            return min(MIN_COMPRESSED_TOKENS, original_tokens)
-        elif tier == 100:
-            # No compression
-            return original_tokens
-        else:
-            # Calculate with minimum threshold
-            calculated = int(original_tokens * tier / 100)
-            return min(max(MIN_COMPRESSED_TOKENS, calculated), original_tokens)
+        return _estimate_file_tokens(original_tokens, tier)
     
     def _build_fixed_section(self, fixed_files: List[Dict[str, Any]], fixed_tokens: int, remaining_budget: int) -> str:
         """Build the fixed files section for the prompt.
@@ -174,9 +676,8 @@ class Planner:
             "\nFiles with user-specified compression (DO NOT include in your plan):"
         ]
         
-        for f in fixed_files:
-            tier_name = TIER_NAMES.get(f['tier'], f"tier-{f['tier']}")
-            lines.append(f"{f['path']} - {f['original_tokens']:,} tokens → {tier_name} compression")
+        # Levels are the tier numbers the system prompt lists
+        lines.extend([f"{f['path']}\t{f['original_tokens']}\t{f['tier']}" for f in fixed_files])
         
         return "\n".join(lines) + "\n"
     
@@ -189,6 +690,9 @@ class Planner:
         Returns:
             Tuple of (total_estimated, file_estimates)
         """
+        if np is not None and len(files_plan) >= NUMPY_MIN_FILES:
+            return self._calculate_estimated_tokens_numpy(files_plan)
+        
         file_estimates = []
         total_estimated = 0
         
@@ -202,49 +706,111 @@ class Planner:
         
         return total_estimated, file_estimates
     
+    def _calculate_estimated_tokens_numpy(self, files_plan: List[Dict[str, Any]]) -> Tuple[int, List[Tuple[Dict[str, Any], int]]]:
+        """Vectorized _calculate_estimated_tokens for large plans.
+        
+        Applies the same rules as _estimate_file_tokens to whole arrays.
+        int64 keeps original_tokens * tier exact for any realistic file.
+        
+        Args:
+            files_plan: List of file plans
+            
+        Returns:
+            Tuple of (total_estimated, file_estimates)
+        """
+        count = len(files_plan)
+        original = np.fromiter((f["original_tokens"] for f in files_plan), dtype=np.int64, count=count)
+        tiers = np.fromiter((f["tier"] for f in files_plan), dtype=np.int64, count=count)
+        
+        scaled = np.minimum(np.maximum(MIN_COMPRESSED_TOKENS, original * tiers // 100), original)
+        estimated = np.where(
+            tiers == 0,
+            np.minimum(MIN_COMPRESSED_TOKENS, original),
+            np.where(tiers == 100, original, scaled)
+        )
+        
+        return int(estimated.sum()), list(zip(files_plan, estimated.tolist()))
     
-    def _build_validation_tools(self):
+    
+    def _build_validation_tools(self) -> List[Dict[str, Any]]:
         """Define the validation tool for the planner."""
-        return [{
-            "type": "function",
-            "function": {
-                "name": "validate_budget",
-                "description": "Validate that the compression plan fits within budget. Automatically applies 100 token minimum to all compressed files. Returns true if within budget, false if over budget",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "files": {
-                            "type": "array",
-                            "items": {
-                                "type": "object",
-                                "properties": {
-                                    "path": {"type": "string"},
-                                    "original_tokens": {"type": "integer"},
-                                    "tier": {"type": "integer", "enum": [100, 95, 85, 50, 10, 0]}
-                                },
-                                "required": ["path", "original_tokens", "tier"]
-                            }
-                        }
-                    },
-                    "required": ["files"]
-                }
-            }
-        }]
+        return VALIDATE_BUDGET_TOOLS
+    
+    def _read_streamed_reply(self, response: Any) -> StreamedReply:
+        """Consume a streamed completion until its first tool call is complete.
+        
+        Text and tool-call argument deltas are accumulated as they arrive.
+        Once the arguments parse as JSON the stream is abandoned, so tokens
+        the model would generate after the plan are never waited for. An
+        abandoned stream is never stored by litellm's response cache, so
+        replies are not cached; make_plan's plan cache covers repeat runs.
+        
+        Args:
+            response: Streaming response from completion(stream=True)
+            
+        Returns:
+            StreamedReply with the text and the first tool call, if any
+        """
+        content_parts: List[str] = []
+        argument_parts: List[str] = []
+        tool_call_id = None
+        arguments = None
+        
+        try:
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                
+                if delta.content:
+                    content_parts.append(delta.content)
+                
+                for call in delta.tool_calls or ():
+                    # Only the first call carries the plan
+                    if (call.index or 0) != 0:
+                        continue
+                    if call.id:
+                        tool_call_id = call.id
+                    if call.function is not None and call.function.arguments:
+                        argument_parts.append(call.function.arguments)
+                
+                # Arguments are only worth parsing once they can be complete
+                if argument_parts and argument_parts[-1].rstrip().endswith('}'):
+                    try:
+                        _json_loads(''.join(argument_parts))
+                    except ValueError:
+                        continue
+                    arguments = ''.join(argument_parts)
+                    break
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+        
+        if arguments is None and argument_parts:
+            # The stream ended first; let the caller report the parse error
+            arguments = ''.join(argument_parts)
+        
+        return StreamedReply(
+            content=''.join(content_parts) or None,
+            tool_call_id=tool_call_id,
+            arguments=arguments
+        )
     
     def _process_tool_response(
         self, 
-        response: Any, 
+        reply: StreamedReply, 
         effective_budget: int, 
         files: List[Tuple[str, int]], 
         fixed_files: List[Dict[str, Any]], 
         fixed_tokens: int, 
         buffer_percent: int, 
         budget: int
-    ) -> Tuple[Dict[str, Any], bool, Any, Any]:
-        """Process the LLM's tool call response and build the result.
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Process the LLM's tool call and build the result.
         
         Args:
-            response: LLM response
+            reply: Planner turn from _read_streamed_reply
             effective_budget: Budget after buffer
             files: Files for planner
             fixed_files: Files with fixed compression
@@ -253,17 +819,16 @@ class Planner:
             budget: Original budget
             
         Returns:
-            Tuple of (result, is_valid, tool_call, response)
+            Tuple of (result, fits_budget)
         """
-        if not response.choices[0].message.tool_calls:
+        if reply.arguments is None:
             logger.warning("Model did not use validation tool")
             return self._create_error_result(
                 "Model did not generate a proper plan",
-                response.choices[0].message.content
-            ), False, None, response
+                reply.content
+            ), False
         
-        tool_call = response.choices[0].message.tool_calls[0]
-        plan_data = json.loads(tool_call.function.arguments)
+        plan_data = _json_loads(reply.arguments)
         
         # Calculate the validation ourselves
         total_estimated, _ = self._calculate_estimated_tokens(plan_data["files"])
@@ -272,10 +837,10 @@ class Planner:
         result = self._build_plan_result(
             plan_data, files, fixed_files, fixed_tokens, 
             total_estimated, budget, effective_budget, 
-            buffer_percent, response.choices[0].message.content
+            buffer_percent, reply.content
         )
         
-        return result, True, tool_call, response
+        return result, result["total_estimated"] <= effective_budget
     
     def _create_error_result(self, error: str, reasoning: Optional[str] = None) -> Dict[str, Any]:
         """Create an error result.
@@ -391,8 +956,11 @@ class Planner:
         # Build fixed files section if any
         fixed_section = self._build_fixed_section(fixed_files, fixed_tokens, remaining_budget)
         
-        # Build the file list string (only files for planner)
-        file_list = "\n".join(f"{path} - {tokens:,} tokens" for path, tokens in files)
+        # Build the file list string (only files for planner), one
+        # 'path<TAB>tokens' line per file as described in the system prompt.
+        # A list lets join() size the result in one pass; a generator would
+        # be copied into one first
+        file_list = "\n".join([f"{path}\t{tokens}" for path, tokens in files])
         
         # Calculate total tokens (including fixed files)
         total_all_files = sum(f[1] for f in files) + sum(f['original_tokens'] for f in fixed_files)
@@ -435,7 +1003,7 @@ class Planner:
         """
         tools = self._build_validation_tools()
         messages = [
-            {"role": "system", "content": "You are a code compression strategist."},
+            {"role": "system", "content": PLANNER_SYSTEM_PROMPT},
             {"role": "user", "content": prompt}
         ]
         
@@ -443,17 +1011,43 @@ class Planner:
             logger.info(f"Calling {self.model} for planning...")
         
         try:
-            response = completion(
-                model=self.model,
-                messages=messages,
-                tools=tools,
-                tool_choice="auto"
-            )
-            
-            result, _, _, _ = self._process_tool_response(
-                response, effective_budget, files, fixed_files, 
-                fixed_tokens, buffer_percent, budget
-            )
+            reasoning = None
+            for _ in range(PLANNER_MAX_ROUNDS):
+                reply = self._request_plan(messages, tools)
+                
+                # Keep the strategy explanation from the first turn if a
+                # retry only sends a new tool call
+                reasoning = reply.content or reasoning
+                reply = reply._replace(content=reasoning)
+                
+                result, fits = self._process_tool_response(
+                    reply, effective_budget, files, fixed_files, 
+                    fixed_tokens, buffer_percent, budget
+                )
+                if fits or reply.arguments is None or reply.tool_call_id is None:
+                    break
+                
+                # Answer the validate_budget call ourselves and let the
+                # model adjust, instead of it retrying in free text
+                if verbose:
+                    logger.info(f"Plan over budget ({result['total_estimated']:,} tokens), asking for a revision")
+                messages.append({
+                    "role": "assistant",
+                    "content": reply.content,
+                    "tool_calls": [{
+                        "id": reply.tool_call_id,
+                        "type": "function",
+                        "function": {"name": "validate_budget", "arguments": reply.arguments}
+                    }]
+                })
+                messages.append({
+                    "role": "tool",
+                    "tool_call_id": reply.tool_call_id,
+                    "content": (
+                        f"false - plan uses {result['total_estimated']:,} tokens, "
+                        f"budget is {effective_budget:,}. Use more aggressive compression."
+                    )
+                })
             
             if verbose:
                 self._log_plan_result(result, budget)
@@ -464,6 +1058,57 @@ class Planner:
             logger.error(f"Error during planning: {e}")
             raise
     
+    def _request_plan(self, messages: List[Dict[str, Any]], tools: List[Dict[str, Any]]) -> StreamedReply:
+        """Run one planner turn, retrying transient API failures.
+        
+        Rate limits, connection errors and server errors are retried with
+        exponential backoff and jitter; other errors propagate immediately.
+        The stream is read inside the retry, since a dropped connection
+        surfaces while iterating it.
+        
+        Args:
+            messages: Conversation so far
+            tools: Tool definitions offered to the model
+            
+        Returns:
+            StreamedReply for the turn
+        """
+        # Deferred so plans solved locally never import litellm
+        import litellm
+        
+        retriable = (
+            litellm.RateLimitError,
+            litellm.APIConnectionError,
+            litellm.InternalServerError,
+            litellm.ServiceUnavailableError,
+            litellm.Timeout,
+        )
+        
+        for attempt in range(PLANNER_MAX_ATTEMPTS):
+            try:
+                # temperature=0 keeps identical requests identical; models that
+                # only accept the default temperature have it dropped by litellm
+                response = litellm.completion(
+                    model=self.model,
+                    messages=messages,
+                    tools=tools,
+                    tool_choice="auto",
+                    temperature=0,
+                    drop_params=True,
+                    num_retries=0,
+                    stream=True
+                )
+                return self._read_streamed_reply(response)
+            except retriable as e:
+                if attempt == PLANNER_MAX_ATTEMPTS - 1:
+                    raise
+                delay = min(PLANNER_MAX_BACKOFF, 2 ** attempt + random.random())
+                logger.warning(
+                    f"Planner request failed ({type(e).__name__}), "
+                    f"retrying in {delay:.1f}s ({attempt + 1}/{PLANNER_MAX_ATTEMPTS - 1})"
+                )
+                time.sleep(delay)
+    
     def _log_plan_result(self, result: Dict[str, Any], budget: int) -> None:
         """Log plan result for verbose mode.
         
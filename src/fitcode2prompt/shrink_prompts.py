@@ -1,8 +1,13 @@
 """Compression prompt templates for different tiers of code summarization."""
 
-from typing import Dict
+from typing import Dict, Tuple
 
 
+# Closing instruction shared by every compressing prompt; the file content
+# follows it, so each tier's text before it stays a fixed prefix
+RESPONSE_SUFFIX = """    Respond only with the compressed code, no additional text.
+{code}"""
+
 # Tier-specific compression prompts for code files
 # Each tier represents a target compression percentage
 CODE_PROMPTS: Dict[int, str] = {
@@ -24,8 +29,7 @@ KEEP:
 - ALL actual code
 - Function and class definitions unchanged
 
-    Respond only with the compressed code, no additional text.
-{code}""",
+""" + RESPONSE_SUFFIX,
     
     # Tier 85: Light compression (15%) - remove redundant elements while preserving structure
     85: """Compress the following code by 15%. The output MUST be 85% of the original size.
@@ -44,8 +48,7 @@ Try to keep in original form:
 - Critical comments (security warnings, complex algorithm explanations)
 - Business logic and core functionality
 
-    Respond only with the compressed code, no additional text.
-{code}""",
+""" + RESPONSE_SUFFIX,
     
     # Tier 50: Medium compression (50%) - significant reduction while keeping key logic
     50: """Compress the following code by 50%. The output MUST be approximately half the size.
@@ -69,8 +72,7 @@ Try to Keep as actual code:
 - Security/auth checks
 - Non-obvious implementations
 
-    Respond only with the compressed code, no additional text.
-{code}""",
+""" + RESPONSE_SUFFIX,
     
     # Tier 10: Heavy compression (90%) - skeleton with key signatures only
     10: """Compress the following code by 90%. The output MUST be 10% of original size.
@@ -80,13 +82,11 @@ Replace the ENTIRE file with:
 - List of key functions/classes with signatures with a one to three line descriptions for non-obvious or complex functions
 - When possible, preserve actual code for important or complex logic
 
-    Respond only with the compressed code, no additional text.
-{code}""",
+""" + RESPONSE_SUFFIX,
     
     # Tier 0: Maximum compression - brief textual summary only
     0: """Summarize the following code in one to three sentences.
-    Respond only with the compressed code, no additional text.
-{code}"""
+""" + RESPONSE_SUFFIX
 }
 
 def get_doc_prompt(percent: int) -> str:
@@ -102,8 +102,7 @@ def get_doc_prompt(percent: int) -> str:
 
 Start by removing whitespace, then eliminate redundant statements or contents. Then summarize less important details. Continue to summarize more and more as needed to reach the target compression level, trying to retain as much detail about the critical points as possible.
 
-    Respond only with the compressed code, no additional text.
-{{code}}"""
+""" + RESPONSE_SUFFIX
 
 # Documentation-specific prompts for markdown, text, and other doc files
 DOC_PROMPTS: Dict[int, str] = {
@@ -124,10 +123,55 @@ DOC_PROMPTS: Dict[int, str] = {
     
     # Tier 0: Maximum compression - brief summary
     0: """Summarize the following documentation in one to three sentences, capturing its main purpose and key points.
-    Respond only with the compressed code, no additional text.
-{code}"""
+""" + RESPONSE_SUFFIX
 }
 
+def _split(template: str) -> Tuple[str, str]:
+    """Split a template around its {code} placeholder.
+    
+    Args:
+        template: Prompt template containing one {code} placeholder
+        
+    Returns:
+        Tuple of (prefix, suffix) to concatenate around the file content
+    """
+    prefix, _, suffix = template.partition("{code}")
+    return prefix, suffix
+
+# Templates pre-split once at import; callers join prefix + content + suffix
+# instead of running str.format over every file
+CODE_PROMPT_PARTS: Dict[int, Tuple[str, str]] = {tier: _split(t) for tier, t in CODE_PROMPTS.items()}
+DOC_PROMPT_PARTS: Dict[int, Tuple[str, str]] = {tier: _split(t) for tier, t in DOC_PROMPTS.items()}
+
+# Tier order of the tuple-backed prompt tables below
+PROMPT_TIERS: Tuple[int, ...] = (0, 10, 50, 85, 95, 100)
+
+# Slot of each tier in the prompt tuples
+TIER_INDEX: Dict[int, int] = {tier: index for index, tier in enumerate(PROMPT_TIERS)}
+
+# (prefix, suffix) pairs as tuples indexed by TIER_INDEX; code and doc
+# tables share the slot layout
+CODE_PROMPT_TUPLE: Tuple[Tuple[str, str], ...] = tuple(CODE_PROMPT_PARTS[tier] for tier in PROMPT_TIERS)
+DOC_PROMPT_TUPLE: Tuple[Tuple[str, str], ...] = tuple(DOC_PROMPT_PARTS[tier] for tier in PROMPT_TIERS)
+
+
+def tier_index(tier: int) -> int:
+    """Slot of a tier in the prompt tuples.
+    
+    Args:
+        tier: Compression tier
+        
+    Returns:
+        Index into CODE_PROMPT_TUPLE / DOC_PROMPT_TUPLE
+        
+    Raises:
+        KeyError: If the tier is not a known compression tier
+    """
+    try:
+        return TIER_INDEX[tier]
+    except KeyError:
+        raise KeyError(f"Unknown compression tier {tier!r}; valid tiers: {PROMPT_TIERS}") from None
+
 # Tier descriptions for documentation/UI
 TIER_DESCRIPTIONS: Dict[int, str] = {
     0: "Max compression ~100% - one sentence description",
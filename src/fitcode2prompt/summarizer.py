@@ -1,20 +1,38 @@
 """Core Summarizer class for Summarizely."""
 
 import asyncio
+import io
 import json
 import logging
+import os
 import platform
+import re
 import subprocess
+import sys
 import textwrap
 import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from fnmatch import translate
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Union
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple, Union, Callable
 
-from .file_discovery import FileDiscovery
-from .tokenizer import Tokenizer
+from .file_discovery import IO_WORKERS, FileDiscovery, _compile_content_bytes, _search_content
+from .tokenizer import CachedTokenizer
 from .planner import Planner
-from .async_processor import AsyncProcessor
+from .async_processor import NORMCASE_PATHS, AsyncProcessor, FileResult, _compile_glob_matcher
+
+try:
+    import uvloop
+except ImportError:  # optional: summarization runs on the default asyncio loop
+    uvloop = None
+
+try:
+    import orjson
+except ImportError:  # optional: the plan file is written with the json module
+    orjson = None
 
 # ANSI color codes
 class Colors:
@@ -36,6 +54,19 @@ RED = Colors.RED
 BOLD = Colors.BOLD
 RESET = Colors.RESET
 
+# Concurrent file reads; queue depth past this buys no extra disk bandwidth
+READ_CONCURRENCY = 64
+
+# Wraps planner reasoning paragraphs; built once instead of per textwrap.fill() call
+REASONING_WRAPPER = textwrap.TextWrapper(width=80)
+
+# A reasoning line that starts (after indentation) like a JSON object or array,
+# with its newline; [^\S\n] keeps the match from spanning blank lines
+JSON_LINE_RE = re.compile(r'^[^\S\n]*[{\[].*(?:\n|\Z)', re.MULTILINE)
+
+# Written between file sections of the summary output
+SECTION_SEPARATOR = "\n\n---\n\n"
+
 # Tier names mapping
 TIER_NAMES: Dict[int, str] = {
     100: "none", 95: "trim", 85: "light",
@@ -43,6 +74,30 @@ TIER_NAMES: Dict[int, str] = {
 }
 
 
+# Whether _configure_logging() has already run in this process
+_LOGGING_CONFIGURED = False
+
+
+def _configure_logging(verbose: bool) -> None:
+    """Configure root logging for the first Summarizer created in the process.
+    
+    basicConfig() ignores every call after the first one that installs a
+    handler, so later instances skip it entirely.
+    
+    Args:
+        verbose: Log debug messages with timestamps instead of bare info messages
+    """
+    global _LOGGING_CONFIGURED
+    if _LOGGING_CONFIGURED:
+        return
+    _LOGGING_CONFIGURED = True
+    
+    if verbose:
+        logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+
 class FileStats(NamedTuple):
     """File statistics for processing."""
     files_with_tokens: List[Tuple[str, int]]
@@ -73,7 +128,10 @@ class Summarizer:
         compression_config: Dict[str, int] = None,
         line_number_patterns: List[str] = None,
         no_clipboard: bool = False,
-        return_results: bool = False
+        return_results: bool = False,
+        tokens_per_minute: Optional[int] = None,
+        use_plan_cache: bool = True,
+        planner_strategy: str = "dp"
     ):
         """
         Initialize the Summarizer.
@@ -97,6 +155,10 @@ class Summarizer:
             line_number_patterns: List of glob patterns for files to add line numbers
             no_clipboard: Whether to skip copying output to clipboard (default: False)
             return_results: Whether to return the summary text instead of exit code (default: False)
+            tokens_per_minute: Token rate limit for summarizer requests (default: None, unlimited)
+            use_plan_cache: Reuse planner results cached by earlier runs with identical inputs (default: True)
+            planner_strategy: "dp" to plan small file sets with the local knapsack solver,
+                "llm" to always use the planner model (default: "dp")
         """
         self.path = path
         self.include_patterns = include_patterns or ['**/*']
@@ -113,21 +175,33 @@ class Summarizer:
         self.default_compression = default_compression
         self.respect_gitignore = respect_gitignore
         self.compression_config = compression_config or {}
+        # Patterns grouped by tier, ascending so the highest compression comes first
+        patterns_by_tier: Dict[int, List[str]] = {}
+        for pattern, tier in self.compression_config.items():
+            patterns_by_tier.setdefault(tier, []).append(pattern)
+        self._patterns_by_tier = sorted(patterns_by_tier.items())
         self.line_number_patterns = line_number_patterns or []
         self.no_clipboard = no_clipboard
         self.return_results = return_results
+        self.tokens_per_minute = tokens_per_minute
+        self.use_plan_cache = use_plan_cache
+        self.planner_strategy = planner_strategy
+        # Compression patterns match relative to this; resolved once, like the
+        # base FileDiscovery builds its paths from, so matching is string-only
+        base = Path(path).resolve()
+        self._base_str = str(base.parent if base.is_file() else base)
+        # Discovery patterns after the strict_glob transform, built on first use
+        self._patterns_cache: Optional[Tuple[List[str], List[str]]] = None
 
         # Setup logging
-        level = logging.DEBUG if verbose else logging.INFO
-        logging.basicConfig(
-            level=level,
-            format='%(message)s' if not verbose else '%(asctime)s - %(levelname)s - %(message)s'
-        )
+        _configure_logging(verbose)
 
         # Initialize components
         self.file_discovery = FileDiscovery()
+        self._platform = platform.system()
+        self._clipboard_cmd = self._get_clipboard_command(self._platform)
         # Use the same model for tokenization that we'll use for summarization
-        self.tokenizer = Tokenizer(llm_model_summarizer)
+        self.tokenizer = CachedTokenizer(llm_model_summarizer)
 
     def run(self) -> Union[int, str, None]:
         """
@@ -172,46 +246,35 @@ class Summarizer:
             # Show user compression summary if any
             if user_compression_mapping:
                 print(f"\n{BOLD}{CYAN}=== USER-SPECIFIED COMPRESSIONS ==={RESET}")
-                tier_counts = {}
-                for tier in user_compression_mapping.values():
-                    tier_counts[tier] = tier_counts.get(tier, 0) + 1
+                tier_counts = Counter(user_compression_mapping.values())
                 for tier, count in sorted(tier_counts.items()):
                     print(f"  {TIER_NAMES.get(tier, f'tier-{tier}')}: {count} files")
             
-            for file in files:
-                filepath = str(file)
+            file_contents = self._read_files(files)
+            # Count all files in one batched encode
+            token_counts = self.tokenizer.count_tokens_batch([content for _, content in file_contents])
+            
+            user_plan_files = []
+            for (file, content), original_tokens in zip(file_contents, token_counts):
+                filepath = os.fspath(file)
+                total_original_tokens += original_tokens
                 
-                # Read file content and count tokens
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    original_tokens = self.tokenizer.count_tokens(content)
-                    total_original_tokens += original_tokens
-                    
-                    if filepath in user_compression_mapping:
-                        # This is a user-specified file - compress it now
-                        tier = user_compression_mapping[filepath]
-                        
-                        # Create a mini-plan for this single file
-                        mini_plan = {
-                            'files': [{
-                                'path': filepath,
-                                'original_tokens': original_tokens,
-                                'tier': tier
-                            }]
-                        }
-                        
-                        # Run compression on this file
-                        result = self._run_async_summarization(mini_plan)[0]
-                        user_results.append(result)
-                        user_actual_tokens += self.tokenizer.count_tokens(result['summary'])
-                    else:
-                        # This file goes to the planner
-                        planner_files.append((filepath, original_tokens))
-                        
-                except UnicodeDecodeError:
-                    logging.warning(f"Cannot decode {file}")
-                    continue
+                if filepath in user_compression_mapping:
+                    # This is a user-specified file - compress it with the others below
+                    user_plan_files.append({
+                        'path': filepath,
+                        'original_tokens': original_tokens,
+                        'tier': user_compression_mapping[filepath],
+                        'content': content
+                    })
+                else:
+                    # This file goes to the planner
+                    planner_files.append((filepath, original_tokens))
+            
+            # Run all user-specified compressions concurrently in one batch
+            if user_plan_files:
+                user_results = self._run_async_summarization({'files': user_plan_files})
+                user_actual_tokens = sum(r.compressed_tokens for r in user_results)
             
             # Report user compression results
             if user_results:
@@ -272,9 +335,9 @@ class Summarizer:
             
             # Create a combined plan for output statistics
             combined_plan = {
-                'files': [r for r in all_results],
+                'files': [r._asdict() for r in all_results],
                 'budget': self.budget,
-                'total_estimated': sum(self.tokenizer.count_tokens(r['summary']) for r in all_results)
+                'total_estimated': sum(r.compressed_tokens for r in all_results)
             }
             
             return self._finalize_output(all_results, total_original_tokens, combined_plan, time.time() - start_time)
@@ -282,7 +345,6 @@ class Summarizer:
         except Exception as e:
             logging.error(f"Unexpected error during summarization: {e}")
             if self.verbose:
-                import traceback
                 traceback.print_exc()
             if self.return_results:
                 return None
@@ -291,7 +353,7 @@ class Summarizer:
     
     def _finalize_output(
         self, 
-        results: List[Dict[str, Any]], 
+        results: List[FileResult], 
         total_tokens: int, 
         plan: Dict[str, Any], 
         total_time: float
@@ -308,17 +370,11 @@ class Summarizer:
             If return_results=False: 0 for success
             If return_results=True: String containing the summary text, or None on error
         """
-        self._write_output(results, total_tokens, plan, total_time)
+        output_text = self._write_output(results, total_tokens, plan, total_time)
         
         if self.return_results:
-            # Read the output file content and return it
-            output_path = self.output_dir / "fitcode2prompt.out"
-            try:
-                with open(output_path, 'r') as f:
-                    return f.read()
-            except Exception as e:
-                logging.error(f"Failed to read output file: {e}")
-                return None
+            # Return the text just written, no need to read the file back
+            return output_text
         
         return 0
 
@@ -336,10 +392,13 @@ class Summarizer:
         # Apply buffer to the remaining budget
         planner_budget = int(remaining_budget * (1 - self.buffer_percent / 100))
         
-        print(f"\n{CYAN}Submitting to planner ({self.llm_model_planner})...{RESET}")
-        print(f"Planner budget: {planner_budget:,} tokens (with {self.buffer_percent}% buffer)")
+        planner = Planner(model=self.llm_model_planner, use_cache=self.use_plan_cache)
         
-        planner = Planner(model=self.llm_model_planner)
+        if planner.uses_local_solver(len(planner_files), self.planner_strategy):
+            print(f"\n{CYAN}Planning locally (knapsack solver)...{RESET}")
+        else:
+            print(f"\n{CYAN}Submitting to planner ({self.llm_model_planner})...{RESET}")
+        print(f"Planner budget: {planner_budget:,} tokens (with {self.buffer_percent}% buffer)")
         
         try:
             plan = planner.make_plan(
@@ -347,7 +406,8 @@ class Summarizer:
                 budget=planner_budget,
                 buffer_percent=0,  # Buffer already applied
                 verbose=False,
-                fixed_files=[]  # No fixed files for planner
+                fixed_files=[],  # No fixed files for planner
+                strategy=self.planner_strategy
             )
         except Exception as e:
             logging.error(f"Planner failed: {e}")
@@ -378,17 +438,12 @@ class Summarizer:
         
         # Print tier distribution
         if plan.get('files'):
-            tier_counts = {}
-            for f in plan.get('files', []):
-                tier = f.get('tier', 100)
-                tier_counts[tier] = tier_counts.get(tier, 0) + 1
+            tier_counts = Counter(f.get('tier', 100) for f in plan['files'])
             
-            if tier_counts:
-                print(f"\n{BOLD}Tier distribution:{RESET}")
-                for tier in sorted(tier_counts.keys(), reverse=True):
-                    tier_name = TIER_NAMES.get(tier, f"tier-{tier}")
-                    count = tier_counts[tier]
-                    print(f"  {tier_name:<8}: {count:3} files")
+            print(f"\n{BOLD}Tier distribution:{RESET}")
+            for tier, count in sorted(tier_counts.items(), reverse=True):
+                tier_name = TIER_NAMES.get(tier, f"tier-{tier}")
+                print(f"  {tier_name:<8}: {count:3} files")
         
         return plan
     
@@ -408,126 +463,179 @@ class Summarizer:
         """
         file_to_compression = {}
         
-        # Process each compression level
-        # Lower tier values = higher compression, so process in ascending order
-        # This way if a file appears in multiple levels, highest compression wins
-        # Get all unique tiers from compression_config
-        all_tiers = sorted(set(self.compression_config.values()))
-        for tier in all_tiers:
-            # Get patterns for this tier from compression_config
-            patterns_for_tier = [
-                pattern for pattern, level in self.compression_config.items() 
-                if level == tier
-            ]
+        # Compile each tier's patterns once, into one matcher per tier.
+        # Lower tier values = higher compression and tiers are grouped in ascending
+        # order, so the first tier a file matches is the highest compression it asked for
+        tier_matchers = [
+            (tier, self._compile_tier(patterns_for_tier))
+            for tier, patterns_for_tier in self._patterns_by_tier
+        ]
+        
+        if not tier_matchers:
+            return file_to_compression
+        
+        def assign_tier(filepath: str) -> Optional[int]:
+            rel_path = self._relative_path(filepath)
+            path = Path(rel_path)
             
-            if not patterns_for_tier:
-                continue
-                
-            # Find all files matching patterns for this tier
-            for file in files:
-                filepath = str(file)
-                
-                # Skip if already assigned (conflict resolution: first match wins)
-                if filepath in file_to_compression:
-                    continue
-                    
-                # Check if file matches any pattern for this tier
-                for pattern in patterns_for_tier:
-                    if self._file_matches_pattern(filepath, pattern):
-                        file_to_compression[filepath] = tier
-                        break
+            for tier, matches in tier_matchers:
+                if matches(filepath, rel_path, path):
+                    return tier
+            return None
+        
+        filepaths = [os.fspath(file) for file in files]
+        if any('::' in pattern for pattern in self.compression_config):
+            # Content patterns read and search files; overlap that I/O
+            with ThreadPoolExecutor(max_workers=IO_WORKERS) as executor:
+                tiers = list(executor.map(assign_tier, filepaths))
+        else:
+            tiers = [assign_tier(filepath) for filepath in filepaths]
+        
+        for filepath, tier in zip(filepaths, tiers):
+            if tier is not None:
+                file_to_compression[filepath] = tier
         
         return file_to_compression
     
-    def _file_matches_pattern(self, filepath: str, pattern: str) -> bool:
+    def _relative_path(self, filepath: str) -> str:
         """
-        Check if a file matches a compression pattern.
+        Get a discovered file's path relative to the base directory.
+        
+        Discovered files already live under the resolved base, so this is
+        pure string work with no filesystem calls.
         
         Args:
-            filepath: Full path to the file
-            pattern: Pattern to match (may include '::' for content search)
+            filepath: Path to the file
             
         Returns:
-            True if file matches the pattern
+            Relative path, or just the filename if the file is outside the base
         """
-        from fnmatch import fnmatch
-        from pathlib import Path
-        
-        # Get relative path for matching
         try:
-            base = Path(self.path).resolve()
-            file_path = Path(filepath).resolve()
-            
-            # If base is a file, use its parent directory
-            if base.is_file():
-                base = base.parent
-                
-            rel_path = str(file_path.relative_to(base))
+            rel_path = os.path.relpath(filepath, self._base_str)
         except ValueError:
+            # Different drive on Windows
+            return os.path.basename(filepath)
+        
+        if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
             # Not relative to base, use just the filename
-            rel_path = Path(filepath).name
+            return os.path.basename(filepath)
+        return rel_path
+    
+    def _compile_tier(self, patterns: List[str]) -> Callable[[str, str, Path], bool]:
+        """
+        Compile all patterns of one tier into a single matcher.
+        
+        Plain fnmatch globs are merged into one regex, tried against the
+        relative path and the basename. '**' globs follow, and content
+        searches, which read the file, run last.
+        
+        Args:
+            patterns: Patterns assigned to the tier
             
-        # Handle content-based patterns
-        if '::' in pattern:
-            glob_part, search_term = pattern.split('::', 1)
+        Returns:
+            Callable taking (filepath, rel_path, Path(rel_path)) that returns
+            True if the file matches any of the patterns
+        """
+        plain_globs = []
+        glob_matchers = []
+        content_matchers = []
+        for pattern in patterns:
+            if '::' in pattern:
+                content_matchers.append(self._compile_compression_pattern(pattern))
+            elif '**' in pattern:
+                glob_matchers.append(self._compile_glob(pattern))
+            else:
+                plain_globs.append(pattern)
+        
+        if plain_globs:
+            # Normcased like fnmatch: case-insensitive with either separator on Windows
+            regex = re.compile('|'.join(translate(os.path.normcase(p)) for p in plain_globs))
+            if NORMCASE_PATHS:
+                match = lambda value: regex.match(os.path.normcase(value))
+            else:
+                match = regex.match
+            glob_matchers.insert(
+                0, lambda rel_path, path: bool(match(rel_path) or match(path.name))
+            )
+        
+        def matches(filepath: str, rel_path: str, path: Path) -> bool:
+            return (
+                any(matches_glob(rel_path, path) for matches_glob in glob_matchers)
+                or any(matches_content(filepath, rel_path, path) for matches_content in content_matchers)
+            )
+        
+        return matches
+    
+    def _compile_compression_pattern(self, pattern: str) -> Callable[[str, str, Path], bool]:
+        """
+        Compile a compression pattern into a matcher.
+        
+        Args:
+            pattern: Pattern to match (may include '::' for content search)
             
-            # Check glob pattern first
-            if not self._matches_glob(rel_path, glob_part):
+        Returns:
+            Callable taking (filepath, rel_path, Path(rel_path)) that returns
+            True if the file matches the pattern
+        """
+        if '::' not in pattern:
+            # Regular glob pattern
+            matches_glob = self._compile_glob(pattern)
+            return lambda filepath, rel_path, path: matches_glob(rel_path, path)
+        
+        # Content-based pattern: glob first, then search the file content
+        glob_part, search_term = pattern.split('::', 1)
+        matches_glob = self._compile_glob(glob_part)
+        try:
+            regex = re.compile(search_term, re.MULTILINE | re.IGNORECASE)
+        except re.error as e:
+            logging.warning(f"Invalid search term in compression pattern '{pattern}': {e}")
+            return lambda filepath, rel_path, path: False
+        bytes_regex = _compile_content_bytes(search_term)
+        
+        def matches(filepath: str, rel_path: str, path: Path) -> bool:
+            if not matches_glob(rel_path, path):
                 return False
-                
-            # Then check content
             try:
-                import re
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    return bool(re.search(search_term, content, re.MULTILINE | re.IGNORECASE))
+                with open(filepath, 'rb') as f:
+                    return _search_content(f.read(), regex, bytes_regex)
             except Exception:
                 return False
-        else:
-            # Regular glob pattern
-            return self._matches_glob(rel_path, pattern)
+        
+        return matches
     
-    def _matches_glob(self, path: str, pattern: str) -> bool:
+    def _compile_glob(self, pattern: str) -> Callable[[str, Path], bool]:
         """
-        Check if a path matches a glob pattern.
+        Compile a glob pattern into a matcher.
         
         Args:
-            path: Path to check (relative)
             pattern: Glob pattern
             
         Returns:
-            True if path matches pattern
+            Callable taking (rel_path, Path(rel_path)) that returns True if the
+            path matches the pattern
         """
-        from fnmatch import fnmatch
-        from pathlib import Path
-        
         # Special handling for patterns like **/oracles/**
         # This should match any file within the oracles directory tree
         if pattern.startswith('**/') and pattern.endswith('/**'):
-            # Extract the directory name
             dir_name = pattern[3:-3]  # Remove **/ and /**
-            # Check if the path contains this directory
-            return f'/{dir_name}/' in f'/{path}' or path.startswith(f'{dir_name}/')
+            inner = f'/{dir_name}/'
+            prefix = f'{dir_name}/'
+            return lambda rel_path, path: inner in f'/{rel_path}' or rel_path.startswith(prefix)
         
         # Use Path.match for patterns with **, fnmatch for others
         if '**' in pattern:
-            # Try matching with Path.match
-            if Path(path).match(pattern):
-                return True
+            variants = [pattern]
             # Also try with /* appended for directory matching
-            if pattern.endswith('/**') and Path(path).match(pattern + '*'):
-                return True
+            if pattern.endswith('/**'):
+                variants.append(pattern + '*')
             # Try without leading **/ for relative paths
-            if pattern.startswith('**/') and Path(path).match(pattern[3:]):
-                return True
-        else:
-            # Check full path
-            if fnmatch(path, pattern):
-                return True
-            # Also check basename
-            if fnmatch(Path(path).name, pattern):
-                return True
-        return False
+            if pattern.startswith('**/'):
+                variants.append(pattern[3:])
+            return lambda rel_path, path: any(path.match(v) for v in variants)
+        
+        # Check full path, then basename
+        matches_glob = _compile_glob_matcher(pattern)
+        return lambda rel_path, path: matches_glob(rel_path) or matches_glob(path.name)
     
     def _make_recursive(self, pattern: str) -> str:
         """
@@ -567,12 +675,7 @@ class Summarizer:
             Exit code (0 for success)
         """
         # Transform patterns if not using strict glob
-        if not self.strict_glob:
-            include_patterns = [self._make_recursive(p) for p in self.include_patterns]
-            exclude_patterns = [self._make_recursive(p) for p in self.exclude_patterns]
-        else:
-            include_patterns = self.include_patterns
-            exclude_patterns = self.exclude_patterns
+        include_patterns, exclude_patterns = self._prepare_patterns()
 
         # Discover files
         files, errors = self.file_discovery.find_files(
@@ -591,19 +694,16 @@ class Summarizer:
         total_tokens = 0
         file_tokens = []
 
-        for file in files:
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                tokens = self.tokenizer.count_tokens(content)
-                file_tokens.append({
-                    "file": str(file),
-                    "tokens": tokens
-                })
-                total_tokens += tokens
-                logging.info(f"{file}: {tokens:,} tokens")
-            except UnicodeDecodeError:
-                logging.warning(f"Cannot decode {file}")
+        file_contents = self._read_files(files)
+        token_counts = self.tokenizer.count_tokens_batch([content for _, content in file_contents])
+
+        for (file, _), tokens in zip(file_contents, token_counts):
+            file_tokens.append({
+                "file": os.fspath(file),
+                "tokens": tokens
+            })
+            total_tokens += tokens
+            logging.info(f"{file}: {tokens:,} tokens")
 
         # Output summary
         print(f"\nTotal files: {len(file_tokens)}")
@@ -614,6 +714,35 @@ class Summarizer:
 
         return 0
 
+    def _read_files(self, files: List[Path]) -> List[Tuple[Path, str]]:
+        """
+        Read all files concurrently, keeping discovery order.
+
+        Reads run in up to READ_CONCURRENCY worker threads without an event
+        loop, so this also works when called from a running loop. Files
+        that cannot be decoded as UTF-8 are logged and dropped.
+
+        Args:
+            files: Files to read
+
+        Returns:
+            List of (file, content) tuples
+        """
+        def read(file: Path) -> Union[str, UnicodeDecodeError]:
+            try:
+                return Path(file).read_text(encoding='utf-8')
+            except UnicodeDecodeError as e:
+                return e
+
+        contents = []
+        with ThreadPoolExecutor(max_workers=READ_CONCURRENCY) as executor:
+            for file, result in zip(files, executor.map(read, files)):
+                if isinstance(result, UnicodeDecodeError):
+                    logging.warning(f"Cannot decode {file}")
+                else:
+                    contents.append((file, result))
+        return contents
+
     def _print_planner_reasoning(self, plan: Dict[str, Any]) -> None:
         """Pretty print the planner's reasoning.
         
@@ -632,7 +761,7 @@ class Summarizer:
         # Format and print paragraphs
         for paragraph in reasoning.split('\n\n'):
             if paragraph.strip():
-                wrapped = textwrap.fill(paragraph, width=80)
+                wrapped = REASONING_WRAPPER.fill(paragraph)
                 print(wrapped)
                 print()
     
@@ -646,16 +775,10 @@ class Summarizer:
             Cleaned reasoning text
         """
         if '```json' in reasoning:
-            reasoning = reasoning.split('```json')[0].strip()
+            reasoning = reasoning.split('```json', 1)[0].strip()
         
         # Remove any lines that look like JSON
-        lines = reasoning.split('\n')
-        cleaned_lines = [
-            line for line in lines 
-            if not (line.strip().startswith('{') or line.strip().startswith('['))
-        ]
-        
-        return '\n'.join(cleaned_lines).strip()
+        return JSON_LINE_RE.sub('', reasoning).strip()
 
     def _print_tier_summary(self, plan: Dict[str, Any]) -> None:
         """Print summary of tier distribution.
@@ -683,11 +806,7 @@ class Summarizer:
         Returns:
             Dictionary mapping tier to file count
         """
-        tier_counts: Dict[int, int] = {}
-        for f in files:
-            tier = f['tier']
-            tier_counts[tier] = tier_counts.get(tier, 0) + 1
-        return tier_counts
+        return Counter(f['tier'] for f in files)
 
     def _print_file_assignments(self, plan: Dict[str, Any]) -> None:
         """Print file-by-file breakdown of compression assignments.
@@ -782,11 +901,11 @@ class Summarizer:
 
     def _write_output(
         self, 
-        results: List[Dict[str, Any]], 
+        results: List[FileResult], 
         total_tokens: int, 
         plan: Dict[str, Any], 
         total_time: float
-    ) -> None:
+    ) -> str:
         """
         Write the summarization output to files and clipboard.
 
@@ -795,6 +914,9 @@ class Summarizer:
             total_tokens: Total original tokens
             plan: The compression plan used
             total_time: Total execution time in seconds
+
+        Returns:
+            The summary text written to the output file
         """
         # Print summary statistics
         self._print_completion_summary(results, total_tokens, total_time)
@@ -803,20 +925,26 @@ class Summarizer:
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
         
         # Write main output file
-        output_path = self._write_summary_file(results, timestamp)
+        output_path, output_text = self._write_summary_file(results, timestamp)
         print(f"\n{Colors.GREEN}Output written to: {output_path}{Colors.RESET}")
         
-        # Copy to clipboard if requested
-        if not self.no_clipboard:
-            self._copy_to_clipboard(output_path)
+        # Write plan file if planner was used, in the background while the
+        # clipboard command runs; result() re-raises any write error here
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            plan_written = executor.submit(self._write_plan_file, plan, timestamp) if self.use_planner else None
+            
+            # Copy to clipboard if requested
+            if not self.no_clipboard:
+                self._copy_to_clipboard(output_path, output_text)
+            
+            if plan_written is not None:
+                plan_written.result()
         
-        # Write plan file if planner was used
-        if self.use_planner:
-            self._write_plan_file(plan, timestamp)
+        return output_text
     
     def _print_completion_summary(
         self, 
-        results: List[Dict[str, Any]], 
+        results: List[FileResult], 
         total_tokens: int, 
         total_time: float
     ) -> None:
@@ -827,51 +955,58 @@ class Summarizer:
             total_tokens: Total original tokens
             total_time: Total execution time
         """
-        successful = [r for r in results if r['success']]
-        failed = [r for r in results if not r['success']]
+        successful = [r for r in results if r.success]
+        failed = [r for r in results if not r.success]
         
-        print(f"\n{Colors.BOLD}=== SUMMARIZATION COMPLETE ==={Colors.RESET}")
-        print(f"{Colors.GREEN}✓ Success: {len(successful)} files{Colors.RESET}")
+        # Collected and written at once instead of one print() per line
+        lines = [
+            f"\n{Colors.BOLD}=== SUMMARIZATION COMPLETE ==={Colors.RESET}",
+            f"{Colors.GREEN}✓ Success: {len(successful)} files{Colors.RESET}",
+        ]
         
         if failed:
-            print(f"{Colors.RED}✗ Failed: {len(failed)} files{Colors.RESET}")
-            for f in failed:
-                print(f"  - {f['path']}: {f.get('error', 'Unknown error')}")
+            lines.append(f"{Colors.RED}✗ Failed: {len(failed)} files{Colors.RESET}")
+            lines.extend(f"  - {f.path}: {f.error or 'Unknown error'}" for f in failed)
         
         # Calculate compression statistics
-        total_compressed = sum(r.get('compressed_tokens', 0) for r in successful)
+        total_compressed = sum(r.compressed_tokens for r in successful)
         compression_ratio = (1 - total_compressed / total_tokens) * 100 if total_tokens > 0 else 0
         
-        print(f"\nInitial size: {total_tokens:,} tokens")
-        print(f"Final size: {total_compressed:,} tokens")
-        print(f"Actual compression: {compression_ratio:.1f}%")
+        lines.append(f"\nInitial size: {total_tokens:,} tokens")
+        lines.append(f"Final size: {total_compressed:,} tokens")
+        lines.append(f"Actual compression: {compression_ratio:.1f}%")
         
         if self.budget:
             budget_usage = (total_compressed / self.budget * 100) if self.budget > 0 else 0
-            print(f"Budget requested: {self.budget:,} tokens")
-            print(f"Budget usage: {budget_usage:.1f}%")
+            lines.append(f"Budget requested: {self.budget:,} tokens")
+            lines.append(f"Budget usage: {budget_usage:.1f}%")
         
         # Display execution time
-        self._print_execution_time(total_time)
+        lines.append(self._format_execution_time(total_time))
+        
+        sys.stdout.write('\n'.join(lines) + '\n')
+        sys.stdout.flush()
     
-    def _print_execution_time(self, total_time: float) -> None:
-        """Print formatted execution time.
+    def _format_execution_time(self, total_time: float) -> str:
+        """Format the total execution time line.
         
         Args:
             total_time: Total time in seconds
+            
+        Returns:
+            Line reporting the time
         """
         if total_time < 60:
-            print(f"Total time: {total_time:.1f}s")
-        else:
-            minutes = int(total_time // 60)
-            seconds = int(total_time % 60)
-            print(f"Total time: {minutes}m {seconds}s")
+            return f"Total time: {total_time:.1f}s"
+        minutes = int(total_time // 60)
+        seconds = int(total_time % 60)
+        return f"Total time: {minutes}m {seconds}s"
     
     def _write_summary_file(
         self, 
-        results: List[Dict[str, Any]], 
+        results: List[FileResult], 
         timestamp: str
-    ) -> Path:
+    ) -> Tuple[Path, str]:
         """Write the main summary file.
         
         Args:
@@ -879,64 +1014,61 @@ class Summarizer:
             timestamp: Timestamp for filename
             
         Returns:
-            Path to written file
+            Tuple of (path to written file, text written to it)
         """
         self.output_dir.mkdir(parents=True, exist_ok=True)
         output_path = self.output_dir / "fitcode2prompt.out"
         
-        successful = [r for r in results if r['success']]
-        base_path = Path(self.path).resolve()
+        successful = [r for r in results if r.success]
         
-        with open(output_path, 'w') as f:
-            for i, result in enumerate(successful):
-                self._write_file_section(f, result, base_path)
-                
-                # Add separator between files
-                if i < len(successful) - 1:
-                    f.write("\n\n---\n\n")
+        # Built in memory so callers reuse the text instead of reading it back
+        buffer = io.StringIO()
+        for i, result in enumerate(successful):
+            self._write_file_section(buffer, result, self._relative_path(result.path))
+            
+            # Add separator between files
+            if i < len(successful) - 1:
+                buffer.write(SECTION_SEPARATOR)
+        output_text = buffer.getvalue()
+        
+        # UTF-8 so the clipboard commands can read the file as-is
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(output_text)
         
-        return output_path
+        return output_path, output_text
     
     def _write_file_section(
         self, 
         file_handle, 
-        result: Dict[str, Any], 
-        base_path: Path
+        result: FileResult, 
+        rel_path: str
     ) -> None:
         """Write a single file's section to the output.
         
         Args:
             file_handle: Open file handle
             result: File processing result
-            base_path: Base path for relative paths
+            rel_path: Path of the file relative to the base directory
         """
-        # Get relative path
-        try:
-            rel_path = Path(result['path']).relative_to(base_path)
-        except ValueError:
-            rel_path = Path(result['path']).name
-        
-        # Write header
-        file_handle.write(f"## {rel_path}\n")
-        
-        # Write statistics
-        original = result['original_tokens']
-        compressed = result.get('compressed_tokens', 0)
-        tier = result['tier']
+        original = result.original_tokens
+        compressed = result.compressed_tokens
+        tier = result.tier
         
+        # Write header and statistics together
         if tier < 100:
             actual_compression = ((original - compressed) / original * 100) if original > 0 else 0
             tier_name = TIER_NAMES.get(tier, f"tier-{tier}")
             
             file_handle.write(
+                f"## {rel_path}\n"
                 f"**Original:** {original:,} tokens | **Compressed:** {compressed:,} tokens "
                 f"({actual_compression:.1f}% actual compression, {tier_name})\n\n"
             )
         else:
-            file_handle.write(f"**Original:** {original:,} tokens | **Preserved as-is (none)**\n\n")
+            file_handle.write(f"## {rel_path}\n**Original:** {original:,} tokens | **Preserved as-is (none)**\n\n")
         
         # Write content
-        file_handle.write(result['summary'])
+        file_handle.write(result.summary)
     
     def _write_plan_file(self, plan: Dict[str, Any], timestamp: str) -> None:
         """Write the compression plan to a JSON file.
@@ -946,30 +1078,30 @@ class Summarizer:
             timestamp: Timestamp for filename
         """
         plan_path = self.output_dir / "fitcode2prompt_plan.json"
-        with open(plan_path, 'w') as f:
-            json.dump(plan, f, indent=2)
+        if orjson is not None:
+            data = orjson.dumps(plan, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        else:
+            data = json.dumps(plan, indent=2).encode('utf-8')
+        plan_path.write_bytes(data)
 
-    def _copy_to_clipboard(self, file_path: Path) -> None:
-        """Copy file contents to clipboard if supported.
+    def _copy_to_clipboard(self, file_path: Path, content: str) -> None:
+        """Copy output text to clipboard if supported.
         
         Args:
-            file_path: Path to file to copy
+            file_path: UTF-8 output file holding `content`
+            content: Text to copy
         """
         try:
-            # Read file content
-            with open(file_path, 'r') as f:
-                content = f.read()
-            
-            # Get clipboard command for platform
-            system = platform.system()
-            clipboard_cmd = self._get_clipboard_command(system)
+            # Clipboard command for the platform, looked up in __init__
+            system = self._platform
+            clipboard_cmd = self._clipboard_cmd
             
             if not clipboard_cmd:
                 logging.debug(f"No clipboard command available for {system}")
                 return
             
             # Execute clipboard command
-            self._execute_clipboard_command(clipboard_cmd, content, system)
+            self._execute_clipboard_command(clipboard_cmd, file_path, content, system)
             print(f"{Colors.GREEN}✓ Output copied to clipboard{Colors.RESET}")
             
         except (subprocess.CalledProcessError, FileNotFoundError) as e:
@@ -996,6 +1128,7 @@ class Summarizer:
     def _execute_clipboard_command(
         self, 
         cmd: List[str], 
+        file_path: Path,
         content: str, 
         system: str
     ) -> None:
@@ -1003,21 +1136,30 @@ class Summarizer:
         
         Args:
             cmd: Command list
+            file_path: UTF-8 output file holding `content`
             content: Content to copy
             system: Platform system name
         """
-        encoding = 'utf-16' if system == 'Windows' else 'utf-8'
-        
         try:
-            subprocess.run(cmd, input=content.encode(encoding), check=True)
+            if system == 'Windows':
+                # clip reads UTF-16, so the UTF-8 file cannot be passed as-is
+                subprocess.run(cmd, input=content.encode('utf-16'), check=True)
+            else:
+                self._pipe_file_to_command(cmd, file_path)
         except FileNotFoundError:
             # Linux fallback to xsel
             if system == 'Linux':
-                subprocess.run(
-                    ['xsel', '--clipboard', '--input'], 
-                    input=content.encode('utf-8'), 
-                    check=True
-                )
+                self._pipe_file_to_command(['xsel', '--clipboard', '--input'], file_path)
+    
+    def _pipe_file_to_command(self, cmd: List[str], file_path: Path) -> None:
+        """Run a command with a file as its stdin, without reading it into memory.
+        
+        Args:
+            cmd: Command list
+            file_path: File to feed to the command
+        """
+        with open(file_path, 'rb') as f:
+            subprocess.run(cmd, stdin=f, check=True)
 
     def _prepare_patterns(self) -> Tuple[List[str], List[str]]:
         """Prepare include and exclude patterns based on glob mode.
@@ -1025,14 +1167,16 @@ class Summarizer:
         Returns:
             Tuple of (include_patterns, exclude_patterns)
         """
-        if not self.strict_glob:
-            include_patterns = [self._make_recursive(p) for p in self.include_patterns]
-            exclude_patterns = [self._make_recursive(p) for p in self.exclude_patterns]
-        else:
-            include_patterns = self.include_patterns[:]
-            exclude_patterns = self.exclude_patterns[:]
-        
-        return include_patterns, exclude_patterns
+        if self._patterns_cache is None:
+            if not self.strict_glob:
+                include_patterns = [self._make_recursive(p) for p in self.include_patterns]
+                exclude_patterns = [self._make_recursive(p) for p in self.exclude_patterns]
+            else:
+                include_patterns = self.include_patterns[:]
+                exclude_patterns = self.exclude_patterns[:]
+            self._patterns_cache = (include_patterns, exclude_patterns)
+        
+        return self._patterns_cache
 
     def _run_async_summarization(self, plan):
         """Run async summarization with progress tracking."""
@@ -1049,15 +1193,19 @@ class Summarizer:
         processor = AsyncProcessor(
             model=self.llm_model_summarizer,
             max_concurrent=50,
-            line_number_patterns=self.line_number_patterns
+            line_number_patterns=self.line_number_patterns,
+            tokens_per_minute=self.tokens_per_minute,
+            tokenizer=self.tokenizer
         )
 
-        # Run async processing
-        loop = asyncio.new_event_loop()
+        # Run async processing, on uvloop's lower-overhead loop when installed
+        loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
-        results = loop.run_until_complete(
-            processor.process_files_with_plan(plan['files'], self.path)
-        )
-        loop.close()
+        try:
+            results = loop.run_until_complete(
+                processor.process_files_with_plan(plan['files'], self.path)
+            )
+        finally:
+            loop.close()
 
         return results
\ No newline at end of file
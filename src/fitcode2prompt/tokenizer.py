@@ -1,7 +1,8 @@
 """Token counting module using tiktoken."""
 
 import logging
-from typing import Dict, Optional
+import os
+from typing import Dict, List, Optional, Tuple
 
 import tiktoken
 
@@ -34,6 +35,46 @@ MODEL_ENCODING_MAP: Dict[str, str] = {
 # Default encoding to use when model is unknown
 DEFAULT_ENCODING = "cl100k_base"
 
+# Threads tiktoken uses for batched encodes
+ENCODE_THREADS = os.cpu_count() or 1
+
+# Encodings resolved so far, keyed by the model or encoding name a Tokenizer
+# was created with; shared so each name is resolved (and any unknown-model
+# warning logged) once per process
+_ENCODINGS: Dict[str, tiktoken.Encoding] = {}
+
+# Characters per token assumed for the first prefix truncate_to_tokens encodes;
+# generous, since code averages about four
+TRUNCATE_CHARS_PER_TOKEN = 8
+
+# Maximum number of cached token counts in CachedTokenizer
+TOKEN_COUNT_CACHE_SIZE = 100_000
+
+
+def _prefix_cut(text: str, limit: int) -> Optional[int]:
+    """Find a prefix end at or before `limit` that tokenizes like the full text.
+    
+    tiktoken splits text into pieces with a regex before merging. In the
+    OpenAI encodings no piece runs from a newline into a following letter or
+    digit, and a newline after a non-space character never joins a longer
+    whitespace run. Cutting between such a newline and a letter or digit
+    leaves every earlier piece, and so every earlier token, the same as in
+    the full text.
+    
+    Args:
+        text: Full text
+        limit: Maximum prefix length in characters
+        
+    Returns:
+        Prefix length, or None if there is no safe cut point
+    """
+    cut = text.rfind('\n', 1, limit)
+    while cut != -1:
+        if not text[cut - 1].isspace() and cut + 1 < len(text) and text[cut + 1].isalnum():
+            return cut + 1
+        cut = text.rfind('\n', 1, cut)
+    return None
+
 
 class Tokenizer:
     """Handles token counting for different models."""
@@ -46,7 +87,10 @@ class Tokenizer:
             model: Either a model name (e.g. "gpt-4") or encoding name (e.g. "cl100k_base")
         """
         self.model = model
-        self.encoding = self._get_encoding(model)
+        encoding = _ENCODINGS.get(model)
+        if encoding is None:
+            encoding = _ENCODINGS[model] = self._get_encoding(model)
+        self.encoding = encoding
         
     def _get_encoding(self, model: str) -> tiktoken.Encoding:
         """Get the appropriate encoding for a model.
@@ -63,18 +107,16 @@ class Tokenizer:
             logger.debug(f"Using custom mapping: {model} -> {encoding_name}")
             return tiktoken.get_encoding(encoding_name)
         
+        # Try as an encoding name directly; listing the names loads nothing
+        if model in tiktoken.list_encoding_names():
+            return tiktoken.get_encoding(model)
+        
         # Try as a known model name
         try:
             return tiktoken.encoding_for_model(model)
         except KeyError:
             pass
         
-        # Try as an encoding name directly
-        try:
-            return tiktoken.get_encoding(model)
-        except ValueError:
-            pass
-        
         # Default to cl100k_base for unknown models
         logger.warning(
             f"Unknown model '{model}', defaulting to {DEFAULT_ENCODING} encoding"
@@ -85,6 +127,9 @@ class Tokenizer:
         """
         Count tokens in a text string.
         
+        Special-token text such as <|endoftext|> is counted as ordinary
+        content, which also skips tiktoken's special-token scan.
+        
         Args:
             text: Text to count tokens for
             
@@ -95,13 +140,37 @@ class Tokenizer:
             return 0
         
         try:
-            return len(self.encoding.encode(text))
+            return len(self.encoding.encode_ordinary(text))
         except Exception as e:
             logger.error(f"Error counting tokens: {e}")
             # Fallback: rough estimate based on characters
             # Average ~4 characters per token for English text
             return len(text) // 4
     
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens in many texts with one batched encode.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Number of tokens per text, in input order
+        """
+        if not texts:
+            return []
+        
+        try:
+            # Ordinary encoding treats special-token text as content, like
+            # count_tokens; the batch is split across threads with the GIL released
+            return [
+                len(tokens)
+                for tokens in self.encoding.encode_ordinary_batch(texts, num_threads=ENCODE_THREADS)
+            ]
+        except Exception as e:
+            logger.error(f"Error counting tokens in batch: {e}")
+            return [self.count_tokens(text) for text in texts]
+    
     def truncate_to_tokens(self, text: str, max_tokens: int) -> str:
         """Truncate text to fit within token limit.
         
@@ -115,7 +184,19 @@ class Tokenizer:
         if not text or max_tokens <= 0:
             return ""
         
-        tokens = self.encoding.encode(text)
+        # Encode growing prefixes so a short limit on a long text does not
+        # pay for encoding all of it
+        window = max_tokens * TRUNCATE_CHARS_PER_TOKEN
+        while window < len(text):
+            cut = _prefix_cut(text, window)
+            if cut is None:
+                break
+            tokens = self.encoding.encode_ordinary(text[:cut])
+            if len(tokens) >= max_tokens:
+                return self.encoding.decode(tokens[:max_tokens])
+            window *= 2
+        
+        tokens = self.encoding.encode_ordinary(text)
         if len(tokens) <= max_tokens:
             return text
         
@@ -130,4 +211,77 @@ class Tokenizer:
         Returns:
             List of encoding names
         """
-        return list(tiktoken.list_encoding_names())
\ No newline at end of file
+        return list(tiktoken.list_encoding_names())
+
+
+class CachedTokenizer(Tokenizer):
+    """Tokenizer that remembers counts for text it has already seen.
+    
+    File contents are counted once during discovery and summaries once by
+    the processor; later counts of the same text (output statistics, budget
+    checks) are then dictionary lookups instead of another BPE pass.
+    """
+    
+    def __init__(self, model: str = DEFAULT_ENCODING) -> None:
+        """
+        Initialize tokenizer with an empty count cache.
+        
+        Args:
+            model: Either a model name (e.g. "gpt-4") or encoding name (e.g. "cl100k_base")
+        """
+        super().__init__(model)
+        # Keyed by (len(text), hash(text)) so whole file contents are not kept
+        # alive; the length makes a hash collision between different texts even
+        # less likely. Evicted oldest-first.
+        self._counts: Dict[Tuple[int, int], int] = {}
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Count tokens in a text string, reusing earlier counts.
+        
+        Args:
+            text: Text to count tokens for
+            
+        Returns:
+            Number of tokens
+        """
+        if not text:
+            return 0
+        
+        key = (len(text), hash(text))
+        cached = self._counts.get(key)
+        if cached is not None:
+            return cached
+        
+        count = super().count_tokens(text)
+        self._remember(key, count)
+        
+        return count
+    
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """
+        Count tokens in many texts, batch-encoding only the uncached ones.
+        
+        Args:
+            texts: Texts to count tokens for
+            
+        Returns:
+            Number of tokens per text, in input order
+        """
+        keys = [(len(text), hash(text)) for text in texts]
+        counts = [self._counts.get(key) for key in keys]
+        
+        missing = [i for i, count in enumerate(counts) if count is None and texts[i]]
+        if missing:
+            fresh = super().count_tokens_batch([texts[i] for i in missing])
+            for i, count in zip(missing, fresh):
+                counts[i] = count
+                self._remember(keys[i], count)
+        
+        return [count or 0 for count in counts]
+    
+    def _remember(self, key: Tuple[int, int], count: int) -> None:
+        """Cache a count, evicting the oldest entry when full."""
+        if len(self._counts) >= TOKEN_COUNT_CACHE_SIZE:
+            self._counts.pop(next(iter(self._counts)))
+        self._counts[key] = count
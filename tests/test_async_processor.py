@@ -0,0 +1,58 @@
+"""Tests for the async processor's line number matching."""
+
+import fnmatch
+import gc
+import ntpath
+import weakref
+
+import pytest
+
+from fitcode2prompt import async_processor
+from fitcode2prompt.async_processor import AsyncProcessor, _compile_glob_matcher
+
+PATTERNS = ["a.py", "*.py", "src/*.py", "src/a.py", "*/a.?y", "[ab].py", "*.PY"]
+VALUES = ["a.py", "b.py", "A.PY", "src/a.py", "src\\a.py", "SRC/A.py", "lib/a.py", "a.pyc", "c.py"]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_glob_matcher_agrees_with_fnmatch(pattern):
+    matches = _compile_glob_matcher(pattern)
+    
+    assert [matches(value) for value in VALUES] == [fnmatch.fnmatch(value, pattern) for value in VALUES]
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_glob_matcher_normcases_on_windows(monkeypatch, pattern):
+    monkeypatch.setattr(async_processor, "NORMCASE_PATHS", True)
+    monkeypatch.setattr(async_processor.os.path, "normcase", ntpath.normcase)
+    
+    matches = _compile_glob_matcher(pattern)
+    expected = [
+        fnmatch.fnmatchcase(ntpath.normcase(value), ntpath.normcase(pattern)) for value in VALUES
+    ]
+    
+    assert [matches(value) for value in VALUES] == expected
+    if pattern == "src/*.py":
+        assert matches("src\\a.py") and matches("SRC/A.py")
+
+
+def test_line_numbers_use_path_relative_to_base(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.py").write_text("x = 1\n")
+    processor = AsyncProcessor(model="test", line_number_patterns=["src/*.py"])
+    
+    assert processor._should_add_line_numbers(str(tmp_path / "src" / "a.py"), str(tmp_path))
+    assert not processor._should_add_line_numbers(str(tmp_path / "a.py"), str(tmp_path))
+    assert processor._rel_path_cache
+    assert not AsyncProcessor(model="test")._rel_path_cache
+
+
+def test_processor_is_not_kept_alive_by_path_caches(tmp_path):
+    processor = AsyncProcessor(model="test", line_number_patterns=["*.py"])
+    processor._should_add_line_numbers(str(tmp_path / "a.py"), str(tmp_path))
+    ref = weakref.ref(processor)
+    
+    del processor
+    gc.collect()
+    
+    assert ref() is None
@@ -0,0 +1,228 @@
+"""Tests for file discovery."""
+
+import threading
+from fnmatch import fnmatch
+
+import pytest
+
+from fitcode2prompt import file_discovery
+from fitcode2prompt.file_discovery import BYTES_SEARCH_THRESHOLD, VALIDATE_WINDOW, FileDiscovery, _compile_glob
+
+
+def _padding(size: int) -> str:
+    """ASCII filler lines adding up to at least `size` characters."""
+    line = "x = 1\n"
+    return line * (size // len(line) + 1)
+
+
+@pytest.fixture
+def discovery():
+    return FileDiscovery()
+
+
+@pytest.mark.parametrize("size", [0, BYTES_SEARCH_THRESHOLD + 1])
+def test_content_search_translates_crlf(tmp_path, discovery, size):
+    (tmp_path / "a.py").write_bytes((_padding(size) + "# TODO\n").replace("\n", "\r\n").encode())
+    
+    assert discovery._file_contains_pattern(tmp_path / "a.py", "TODO$")
+    files, _ = discovery.find_files(str(tmp_path), ["**/*::TODO$"])
+    assert [f.name for f in files] == ["a.py"]
+
+
+@pytest.mark.parametrize("size", [0, BYTES_SEARCH_THRESHOLD + 1])
+def test_content_search_matches_unicode_text(tmp_path, discovery, size):
+    (tmp_path / "a.py").write_text(_padding(size) + "# naïve\n", encoding="utf-8")
+    
+    assert discovery._file_contains_pattern(tmp_path / "a.py", r"na\wve")
+    assert discovery._file_contains_pattern(tmp_path / "a.py", "na.ve")
+
+
+@pytest.mark.parametrize("size", [0, BYTES_SEARCH_THRESHOLD + 1])
+def test_content_search_rejects_invalid_utf8(tmp_path, discovery, size):
+    (tmp_path / "a.py").write_bytes(_padding(size).encode() + b"# TODO \xff\n")
+    
+    assert not discovery._file_contains_pattern(tmp_path / "a.py", "TODO")
+
+
+@pytest.mark.parametrize("size", [0, BYTES_SEARCH_THRESHOLD + 1])
+def test_content_search_ascii_file(tmp_path, discovery, size):
+    (tmp_path / "a.py").write_text(_padding(size) + "# TODO: fix\n")
+    
+    assert discovery._file_contains_pattern(tmp_path / "a.py", r"^# todo\b")
+    assert not discovery._file_contains_pattern(tmp_path / "a.py", "FIXME")
+
+
+def test_validation_reads_input_in_bounded_window(tmp_path, discovery, monkeypatch):
+    for i in range(VALIDATE_WINDOW * 3):
+        (tmp_path / f"{i}.py").write_text("x = 1\n")
+    paths = sorted(tmp_path.iterdir())
+    
+    lock = threading.Lock()
+    validated = 0
+    validate_one = discovery._validate_one
+    
+    def counting_validate(path):
+        nonlocal validated
+        result = validate_one(path)
+        with lock:
+            validated += 1
+        return result
+    
+    monkeypatch.setattr(discovery, "_validate_one", counting_validate)
+    
+    def stream():
+        for drawn, path in enumerate(paths):
+            with lock:
+                assert drawn - validated <= VALIDATE_WINDOW
+            yield path
+    
+    assert discovery._validate_files(stream()) == paths
+
+
+TREE = [
+    "a.py", "b.md", "README.md", ".env", ".hidden/h.py", ".hidden/deep/x.md",
+    "src/main.py", "src/util.c", "src/util.h", "src/.secret.py", "src/pkg/mod.py",
+    "src/pkg/test_mod.py", "src/pkg/data/notes.md", "src/pkg/build/gen.py",
+    "docs/index.md", "docs/api/ref.md", "docs/build/out.html", "build/lib.py",
+    "node_modules/dep/index.js", "lib/node_modules/x.js", "logs/run.log", "logs/old/run.log",
+    "tmp/a.tmp", "src/tmp/b.py", "keep.pyc", "cache.pyc", "src/cache.pyc", "secret.txt",
+    "src/secret.txt", "dist", "pkg/dist/out.py", "Upper/CASE.PY", "!keep.pyc",
+]
+
+
+def _make_tree(base):
+    for rel in TREE:
+        path = base / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"# {rel}\n")
+    # Path.glob's '**' does not descend into symlinked directories
+    (base / "linked").symlink_to(base / "src", target_is_directory=True)
+    (base / "link.py").symlink_to(base / "a.py")
+    return base
+
+
+def _path_glob(base, pattern):
+    return {p for p in base.glob(pattern) if p.is_file()}
+
+
+# Shapes _compile_glob walks itself
+WALKED_GLOBS = [
+    "*.py", "*", "*.md", ".*", "**/*", "**/*.py", "**/.*", "**/test_*.py", "**/*.[ch]",
+    "**/*.?y", "src/*.py", "src/**/*", "src/**/*.py", "src/pkg/**/*.md", ".hidden/*.py",
+    ".hidden/**/*", "**/**/*.md", "linked/*.py", "missing/**/*.py", "**/[!a]*.py",
+]
+
+# Shapes left to Path.glob: '**' at the end, wildcard or '..' directories
+PATH_GLOBS = ["src/**", "**", "**/pkg/*.py", "*/main.py", "src/*/mod.py", "../*.py", "src/pkg/../*.py"]
+
+
+@pytest.mark.parametrize("pattern", WALKED_GLOBS)
+def test_walked_globs_match_path_glob(tmp_path, discovery, pattern):
+    base = _make_tree(tmp_path)
+    
+    assert _compile_glob(pattern) is not None
+    assert discovery._gather_files_by_glob(base, [pattern]) == _path_glob(base, pattern)
+
+
+@pytest.mark.parametrize("pattern", PATH_GLOBS)
+def test_other_globs_fall_back_to_path_glob(tmp_path, discovery, pattern):
+    base = _make_tree(tmp_path)
+    
+    assert _compile_glob(pattern) is None
+    assert discovery._gather_files_by_glob(base, [pattern]) == _path_glob(base, pattern)
+
+
+@pytest.mark.parametrize("pattern", WALKED_GLOBS + PATH_GLOBS)
+def test_glob_subset_matches_path_glob(tmp_path, discovery, pattern):
+    base = _make_tree(tmp_path)
+    files = _path_glob(base, "**/*")
+    
+    assert discovery._glob_subset(base, files, pattern) == files & _path_glob(base, pattern)
+
+
+def test_glob_sets_share_one_walk(tmp_path, discovery):
+    base = _make_tree(tmp_path)
+    pattern_sets = [["**/*.py", "*.md"], ["src/**/*.py"], ["**/*.md", "docs/*.md"]]
+    
+    expected = [set().union(*(_path_glob(base, p) for p in patterns)) for patterns in pattern_sets]
+    assert discovery._gather_glob_sets(base, pattern_sets) == expected
+
+
+def _baseline_is_gitignored(filepath, base_path, gitignore_patterns):
+    """The per-pattern fnmatch filter the compiled GitignoreMatcher replaced."""
+    try:
+        relative_path = filepath.relative_to(base_path)
+    except ValueError:
+        return False
+    relative_str = str(relative_path)
+    path_parts = relative_path.parts
+    
+    for pattern in gitignore_patterns:
+        if pattern.endswith('/'):
+            if any(fnmatch(part, pattern[:-1]) for part in path_parts):
+                return True
+        elif pattern.startswith('/'):
+            if fnmatch(relative_str, pattern[1:]):
+                return True
+        else:
+            if fnmatch(relative_str, pattern):
+                return True
+            if any(fnmatch(part, pattern) for part in path_parts[:-1]):
+                return True
+    return False
+
+
+GITIGNORES = {
+    "common": [
+        "node_modules/", "*.pyc", "/build", "build/", "/docs/*.md", "secret.txt", "!keep.pyc",
+        ".hidden", "logs/*.log", "**/tmp", "dist", "*.LOG", "src/pkg/*", "/src/tmp/", "[Uu]pper/",
+        "*/.secret*",
+    ],
+    "anchored": ["/a.py", "/src", "/src/main.py", "/docs/", "/*.md", "/.env", "/lib/node_modules"],
+    "negation": ["*.pyc", "!keep.pyc", "!*.pyc", "!src/"],
+    # Enough wildcard lines for the Hyperscan database when it is installed
+    "many": [f"gen{i}_*.py" for i in range(32)] + [
+        "*/mod.py", "src/*.[ch]", "te?t_*.py", "[!a]*.md", "docs/*/ref.md",
+    ],
+}
+
+
+@pytest.fixture(params=["re", "hyperscan"])
+def gitignore_engine(request, monkeypatch):
+    if request.param == "hyperscan" and file_discovery.hyperscan is None:
+        pytest.skip("hyperscan is not installed")
+    if request.param == "re":
+        monkeypatch.setattr(file_discovery, "hyperscan", None)
+    else:
+        assert isinstance(
+            file_discovery._compile_gitignore(tuple(GITIGNORES["many"])).floats.regex,
+            file_discovery.HyperscanMatcher
+        )
+    file_discovery._compile_gitignore.cache_clear()
+    yield request.param
+    file_discovery._compile_gitignore.cache_clear()
+
+
+@pytest.mark.parametrize("name", GITIGNORES)
+def test_gitignore_matcher_matches_baseline(tmp_path, discovery, gitignore_engine, name):
+    base = _make_tree(tmp_path)
+    patterns = GITIGNORES[name]
+    files = sorted(_path_glob(base, "**/*"))
+    
+    expected = [f for f in files if not _baseline_is_gitignored(f, base, patterns)]
+    assert [f for f in files if not discovery._is_gitignored(f, base, patterns)] == expected
+    assert list(discovery._filter_gitignored(files, base, patterns)) == expected
+
+
+@pytest.mark.parametrize("name", GITIGNORES)
+def test_gitignore_pruning_matches_baseline(tmp_path, discovery, gitignore_engine, name):
+    base = _make_tree(tmp_path)
+    patterns = GITIGNORES[name]
+    (base / ".gitignore").write_text("# comment\n\n" + "\n".join(patterns) + "\n")
+    include = ["**/*", "**/*.py", "src/**/*.md"]
+    
+    unfiltered, _ = discovery.find_files(str(base), include, respect_gitignore=False)
+    found, errors = discovery.find_files(str(base), include)
+    
+    assert not errors
+    assert found == [f for f in unfiltered if not _baseline_is_gitignored(f, base, patterns)]
@@ -0,0 +1,71 @@
+"""Tests for command-line parsing."""
+
+import argparse
+
+import pytest
+
+from fitcode2prompt.__main__ import _FAST_DEFAULTS, _FAST_OPTIONS, _FAST_TYPES, create_parser, parse_args_fast
+
+ARGVS = [
+    ["."],
+    ["src/app.py"],
+    ["-b", "8,000", "."],
+    [".", "--budget=50k", "--buffer-percent", "5"],
+    ["-i", "*.py,*.md", "-e", "tests/**", "-o", "out", "."],
+    ["--include=**/*.py::TODO", "--exclude=", "."],
+    [".", "--planner", "gpt-4.1", "--planner-strategy", "llm", "--summarizer", "gpt-4.1-mini"],
+    [".", "--tokens-per-minute", "200000", "-m", "o200k_base"],
+    [".", "--encoding-model=o200k_base", "--default-compression", "HEAVY"],
+    [".", "--default-compression=0"],
+    [".", "--compression-0", "*.md", "--compression-5", "a.py", "--compression-15", "b.py"],
+    [".", "--no-compression", "*.md", "--compression-50=c.py", "--compression-90", "d.py", "--compression-100", "e.py"],
+    [".", "--line-numbers", "src/*.py"],
+    [".", "--strict-glob", "--no-ignore", "--no-clipboard", "--no-cache", "--count-only"],
+    ["--count-only", "-b", "1000", "-", "--no-cache"],
+    ["-i", "a.py", "-i", "b.py", "."],
+]
+
+
+@pytest.mark.parametrize("argv", ARGVS)
+def test_fast_parser_matches_argparse(argv):
+    fast = parse_args_fast(argv)
+    
+    assert fast is not None
+    assert fast == create_parser().parse_args(argv)
+
+
+@pytest.mark.parametrize("argv", [
+    [],
+    ["-h"],
+    [".", "--help"],
+    ["a", "b"],
+    [".", "--budg", "5"],
+    [".", "--unknown"],
+    [".", "-b=5"],
+    [".", "-b"],
+    [".", "--buffer-percent", "ten"],
+    [".", "--planner-strategy", "greedy"],
+    [".", "--default-compression", "extreme"],
+    [".", "--no-cache=1"],
+    [".", "-e", "-x"],
+])
+def test_fast_parser_defers_to_argparse(argv):
+    assert parse_args_fast(argv) is None
+
+
+def test_fast_tables_cover_every_parser_option():
+    options = {}
+    defaults = {}
+    types = {}
+    for action in create_parser()._actions:
+        if isinstance(action, argparse._HelpAction) or not action.option_strings:
+            continue
+        for option in action.option_strings:
+            options[option] = (action.dest, action.nargs != 0)
+        defaults[action.dest] = action.default
+        if action.type is not None:
+            types[action.dest] = action.type
+    
+    assert _FAST_OPTIONS == options
+    assert _FAST_DEFAULTS == defaults
+    assert _FAST_TYPES == types
@@ -0,0 +1,69 @@
+"""Tests for the local knapsack planner and the plan cache."""
+
+import json
+
+import pytest
+
+from fitcode2prompt.planner import PLANNER_MAX_ROUNDS, Planner, StreamedReply
+
+
+@pytest.fixture
+def planner():
+    return Planner(model="test", use_cache=False)
+
+
+def _tiers(result):
+    return {f["path"]: f["tier"] for f in result["files"]}
+
+
+@pytest.mark.parametrize("budget, buffer_percent", [(700, 0), (1500, 10)])
+def test_small_files_are_not_inflated(planner, budget, buffer_percent):
+    files = [(f"src/small_{i}.py", 30) for i in range(20)] + [("src/big.py", 2000)]
+    
+    result = planner.make_plan(files, budget, buffer_percent=buffer_percent)
+    
+    assert result["valid"], result
+    assert result["total_estimated"] <= budget * (100 - buffer_percent) // 100
+    tiers = _tiers(result)
+    assert all(tiers[f"src/small_{i}.py"] == 100 for i in range(20))
+
+
+def test_bucketed_budget_falls_back_to_rounding_down(planner):
+    # Rounding 31-token files up to whole 2-token buckets overshoots the
+    # budget; the exact plan still fits
+    files = [(f"src/small_{i}.py", 31) for i in range(100)] + [("src/big.py", 100_000)]
+    
+    result = planner.make_plan(files, 3200, buffer_percent=0)
+    
+    assert result["valid"], result
+    assert result["total_estimated"] <= 3200
+    assert _tiers(result)["src/big.py"] == 0
+
+
+def test_solver_without_plan_falls_back_to_llm(planner, monkeypatch):
+    llm_result = {"valid": True, "files": []}
+    monkeypatch.setattr(planner, "_solve_knapsack", lambda files, budget: None)
+    monkeypatch.setattr(planner, "_get_plan_from_llm", lambda *args, **kwargs: llm_result)
+    
+    result = planner.make_plan([("a.py", 5000), ("b.py", 5000)], 2000, buffer_percent=0)
+    
+    assert result is llm_result
+
+
+def test_over_budget_llm_plan_is_not_cached(tmp_path, monkeypatch):
+    planner = Planner(model="test", use_cache=True, cache_dir=str(tmp_path))
+    files = [("a.py", 5000), ("b.py", 5000)]
+    arguments = json.dumps({"files": [{"path": path, "original_tokens": tokens, "tier": 100} for path, tokens in files]})
+    calls = []
+    
+    def request_plan(messages, tools):
+        calls.append(messages)
+        return StreamedReply(content="keep everything", tool_call_id="call_0", arguments=arguments)
+    
+    monkeypatch.setattr(planner, "_request_plan", request_plan)
+    
+    result = planner.make_plan(files, 2000, buffer_percent=0, strategy="llm")
+    
+    assert result["total_estimated"] > 2000
+    assert len(calls) == PLANNER_MAX_ROUNDS
+    assert list(tmp_path.iterdir()) == []
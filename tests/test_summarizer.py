@@ -0,0 +1,82 @@
+"""Tests for the summarizer's file reading and pattern matching."""
+
+import asyncio
+import ntpath
+from pathlib import Path, PureWindowsPath
+from typing import List
+
+import pytest
+
+from fitcode2prompt import summarizer as summarizer_module
+from fitcode2prompt.file_discovery import BYTES_SEARCH_THRESHOLD
+from fitcode2prompt.summarizer import Summarizer
+
+
+class WordTokenizer:
+    """Counts whitespace-separated words; avoids loading a tiktoken encoding."""
+    
+    def __init__(self, model: str) -> None:
+        self.model = model
+    
+    def count_tokens(self, text: str) -> int:
+        return len(text.split())
+    
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        return [self.count_tokens(text) for text in texts]
+
+
+@pytest.fixture
+def make_summarizer(monkeypatch):
+    monkeypatch.setattr(summarizer_module, "CachedTokenizer", WordTokenizer)
+    
+    def make(path: Path, **kwargs) -> Summarizer:
+        return Summarizer(path=str(path), llm_model_planner="test", llm_model_summarizer="test", no_clipboard=True, **kwargs)
+    
+    return make
+
+
+@pytest.mark.parametrize("size", [0, BYTES_SEARCH_THRESHOLD + 1])
+def test_content_compression_pattern_translates_crlf(tmp_path, make_summarizer, size):
+    text = "x = 1\n" * (size // 6 + 1) + "# TODO\n"
+    (tmp_path / "a.py").write_bytes(text.replace("\n", "\r\n").encode())
+    
+    matches = make_summarizer(tmp_path)._compile_compression_pattern("*.py::TODO$")
+    assert matches(str(tmp_path / "a.py"), "a.py", Path("a.py"))
+
+
+@pytest.mark.parametrize("rel_path, expected", [
+    ("src\\a.py", True),
+    ("SRC\\A.PY", True),
+    ("lib\\a.py", False),
+    ("lib\\NOTES.MD", True),
+])
+def test_tier_globs_normcase_on_windows(tmp_path, make_summarizer, monkeypatch, rel_path, expected):
+    monkeypatch.setattr(summarizer_module, "NORMCASE_PATHS", True)
+    monkeypatch.setattr(summarizer_module.os.path, "normcase", ntpath.normcase)
+    
+    matches = make_summarizer(tmp_path)._compile_tier(["src/*.py", "*.md"])
+    assert matches(rel_path, rel_path, PureWindowsPath(rel_path)) is expected
+
+
+def test_count_tokens_inside_running_event_loop(tmp_path, make_summarizer, capsys):
+    (tmp_path / "a.py").write_text("one two three\n")
+    (tmp_path / "b.py").write_bytes(b"\xff\xfe invalid")
+    summarizer = make_summarizer(tmp_path, include_patterns=["*.py"])
+    
+    async def main() -> int:
+        return summarizer.count_tokens()
+    
+    assert asyncio.run(main()) == 0
+    assert "Total tokens: 3" in capsys.readouterr().out
+
+
+def test_read_files_keeps_order_and_drops_undecodable(tmp_path, make_summarizer):
+    files = []
+    for i in range(10):
+        files.append(tmp_path / f"{i}.py")
+        files[-1].write_text(f"file {i}")
+    (tmp_path / "5.py").write_bytes(b"\xff")
+    
+    contents = make_summarizer(tmp_path)._read_files(files)
+    
+    assert [(f.name, text) for f, text in contents] == [(f"{i}.py", f"file {i}") for i in range(10) if i != 5]